@@ -1,15 +1,25 @@
 import streamlit as st
 import pandas as pd 
-import yfinance as yf
-import datetime as datetime
-import pandas_datareader.data as web
 import CAPM_functions
+import CAPM_pipeline
+import CAPM_portfolio
+import CAPM_risk
+import CAPM_universe
+from pages.utils import instrumentation
+from pages.utils.instrumentation import plotly_chart
 import numpy as np 
 
 st.set_page_config(page_title = "CAPM",
              page_icon = "chart_with_upards_trend",
              layout = "wide")
 st.title ("Capital Asset Pricing Model")
+instrumentation.start_run('capm')
+
+# the Monte Carlo is seeded, so the report only depends on these inputs; other widgets
+# rerun the page without re-simulating the 100,000 paths
+@st.cache_data(show_spinner=False, max_entries=64)
+def risk_report(stocks_daily_return, weights, horizon, dist):
+    return CAPM_risk.risk_report(stocks_daily_return, weights, horizon=horizon, dist=dist)
 
 #prompt the input from the user
 
@@ -21,24 +31,14 @@ with col2:
 
 #downloading data of S&P500
 try:
-    end = datetime.date.today()
-    start = datetime.date(datetime.date.today().year-year, datetime.date.today().month, datetime.date.today().day)
-    SP500 = web.DataReader(['sp500'], 'fred', start, end)
-    print(SP500.head())
-
-    stocks_df = pd.DataFrame()
-
-    for stock in stocks_list:
-        data = yf.download(stock, period=f'{year}y')
-        stocks_df[f'{stock}'] = data['Close']
-
-    stocks_df.reset_index(inplace=True)
-    SP500.reset_index(inplace=True)
-    SP500.columns = ['Date', 'sp500']
-    stocks_df['Date'] = stocks_df['Date'].astype('datetime64[ns]')
-    stocks_df['Date'] = stocks_df['Date'].apply(lambda x: str(x)[:10])
-    stocks_df['Date'] = pd.to_datetime(stocks_df['Date'])
-    stocks_df = pd.merge(stocks_df, SP500, on='Date', how='inner')
+    rf = 0
+    # fetch (concurrent), align on the S&P 500 trading days, returns and CAPM in one call
+    result = CAPM_pipeline.run_capm(stocks_list, years=year, rf=rf)
+    if result.errors:
+        st.warning("Could not load: " + ", ".join(ticker for _, ticker in result.errors))
+    if result.alignment['dropped_rows']:
+        st.caption(f"{result.alignment['dropped_rows']} of {result.alignment['calendar_days']} trading days dropped while aligning")
+    stocks_df = result.prices
 
     col1, col2 = st.columns([1, 1])
     with col1:
@@ -51,22 +51,15 @@ try:
     col1, col2 = st.columns([1, 1])
     with col1:
         st.markdown("### Price OF All The Stocks")
-        st.plotly_chart(CAPM_functions.interactive_plot(stocks_df))
+        plotly_chart(CAPM_functions.interactive_plot(stocks_df), 'prices')
     with col2:
         st.markdown("### After Normalization")
-        st.plotly_chart(CAPM_functions.interactive_plot(CAPM_functions.normalize(stocks_df)))
-
-    stocks_daily_return = CAPM_functions.daily_return(stocks_df)
-    print(stocks_daily_return.head())
+        plotly_chart(CAPM_functions.interactive_plot(CAPM_functions.normalize(stocks_df)), 'normalized')
 
-    beta = {}
-    alpha = {}
-
-    for i in stocks_daily_return.columns:
-        if i != 'Date' and i != 'sp500':
-            b, a = CAPM_functions.calculate_beta(stocks_daily_return, i)
-            beta[i] = b
-            alpha[i] = a 
+    stocks_daily_return = result.returns
+    capm_df = result.capm
+    beta = capm_df['beta'].to_dict()
+    alpha = capm_df['alpha'].to_dict()
     print(beta, alpha)
 
     beta_df = pd.DataFrame(columns=['stock', 'Beta Value'])
@@ -77,19 +70,81 @@ try:
         st.markdown('### Calculated Beta Value')
         st.dataframe(beta_df, use_container_width=True)
 
-    rf = 0
-    rm = stocks_daily_return['sp500'].mean()*252
-
     return_df = pd.DataFrame()
-    return_value = []
-    for stock, value in beta.items():
-        return_value.append(str(round(rf+(value*(rm-rf)), 2)))
-    return_df['stock'] = stocks_list
-    return_df['Return Value'] = return_value
+    return_df['stock'] = capm_df.index
+    return_df['Return Value'] = [str(round(i, 2)) for i in capm_df['expected_return']]
 
     with col2:
         st.markdown( '### Calculated Return Using CAPM')
         st.dataframe(return_df , use_container_width= True)
 
+    st.markdown('### Rolling Beta')
+    # a window as long as the history leaves the whole chart empty, only shorter ones are offered
+    windows = tuple(w for w in (60, 126, 252) if w < len(stocks_daily_return))
+    if windows:
+        window = st.selectbox("Rolling window (trading days)", windows)
+        rolling = CAPM_functions.rolling_capm(stocks_daily_return, window=window)
+        plotly_chart(CAPM_functions.interactive_plot(rolling['beta'].reset_index(), "Rolling Beta vs S&P 500", "Beta"), 'rolling_beta')
+    else:
+        st.caption(f"Not enough history for a rolling beta: {len(stocks_daily_return)} trading days, the shortest window is 60")
+
+    st.markdown('### Efficient Frontier')
+    portfolios, frontier = CAPM_portfolio.efficient_frontier(stocks_daily_return, rf=rf)
+    names, mu, cov = CAPM_portfolio.return_moments(stocks_daily_return)
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        plotly_chart(CAPM_portfolio.frontier_plot(portfolios, frontier, mu, np.sqrt(np.diag(cov)), names), 'frontier')
+    with col2:
+        st.markdown('### Portfolio Weights')
+        st.dataframe(portfolios.round(3), use_container_width=True)
+        if 'Max Sharpe' not in portfolios.index:
+            st.caption("No tangency portfolio: the risk-free rate is above the minimum-variance return")
+
+    st.markdown('### Portfolio Risk (VaR / CVaR)')
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        allocation = st.selectbox("Weights", ('Equal Weight',) + tuple(portfolios.index))
+    with col2:
+        horizon = st.number_input("Horizon (trading days)", 1, 20, 1)
+    with col3:
+        dist = st.selectbox("Monte Carlo shocks", ('normal', 't'))
+    weights = None if allocation == 'Equal Weight' else portfolios.loc[allocation, names].to_numpy(dtype=float)
+    risk_df = risk_report(stocks_daily_return, weights, horizon, dist)
+    st.caption("Losses in percent of portfolio value, Monte Carlo uses 100,000 correlated paths")
+    st.dataframe((risk_df * 100).round(2), use_container_width=True)
+
 except Exception as e:
-    st.error("Please Select The Valid Input")
\ No newline at end of file
+    st.error("Please Select The Valid Input")
+
+# universe-wide ranking from the precomputed index, no downloads on this path
+st.markdown('### Universe Beta Ranking')
+universe = CAPM_universe.load_index()
+if universe is None:
+    st.info("No beta index yet, build it with `python CAPM_universe.py build`")
+else:
+    horizons = sorted(set(universe.index.get_level_values('horizon')))
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        horizon = st.selectbox("Lookback (years)", horizons)
+    with col2:
+        n = st.number_input("Top N", 5, 50, 10)
+    with col3:
+        ticker = st.text_input("Look up ticker", "")
+    st.caption(f"{universe.index.get_level_values('ticker').nunique()} tickers as of {universe['as_of'].iloc[0].date()}")
+    columns = ['beta', 'alpha', 'r2', 'expected_return']
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.markdown('#### Highest Beta')
+        st.dataframe(CAPM_universe.top_n(universe, horizon, n)[columns].round(3), use_container_width=True)
+    with col2:
+        st.markdown('#### Lowest Beta')
+        st.dataframe(CAPM_universe.top_n(universe, horizon, n, highest=False)[columns].round(3), use_container_width=True)
+    if ticker:
+        found = CAPM_universe.lookup(universe, ticker)
+        if found is None:
+            st.warning(f"{ticker.upper()} is not in the index")
+        else:
+            st.dataframe(found[columns].round(3), use_container_width=True)
+
+instrumentation.debug_panel()
+instrumentation.finish_run()
@@ -1,9 +1,13 @@
-import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
+import pandas as pd
+import CAPM_returns
+from pages.utils.instrumentation import timed
 #creating function
 
-def interactive_plot(df):
-    fig = px.line()
+@timed('chart.build.interactive_plot')
+def interactive_plot(df, title="Stock Price Comparison", yaxis_title="Price (USD)"):
+    fig = go.Figure()
     for i in df.columns[1:]:
         fig.add_scatter(x=df['Date'], y=df[i], name=i)
     
@@ -19,37 +23,29 @@ def interactive_plot(df):
             x=1
         ),
         title=dict(
-            text="Stock Price Comparison",
+            text=title,
             y=0.98,
             x=0.5,
             xanchor='center',
             yanchor='top'
         ),
         xaxis_title="Date",
-        yaxis_title="Price (USD)",
+        yaxis_title=yaxis_title,
         hovermode='x unified',
         template='plotly_white'
     )
     
     return fig
 
-#function to normalize the prices
+#function to normalize the prices (each column divided by its first price)
 
 def normalize (df_2):
-    df = df_2.copy()
-    for i in df.columns[1:]:
-        df[i] = df[i]/df[i][0]
-    return df 
+    return CAPM_returns.rebase(df_2)
 
-# function to calculate daily return
+# function to calculate daily return (in percent, first row is 0)
 
 def daily_return(df):
-    df_daily_return = df.copy()
-    for i in df.columns [1:]:
-        for j in range (1,len(df)):
-            df[i][j]= ((df[i][j] - df [i][j-1])/df[i][j-1])*100
-    df_daily_return[i][0] = 0 
-    return df_daily_return
+    return CAPM_returns.simple_returns(df, percent=True)
 
 #function to calculate beta
 
@@ -58,3 +54,90 @@ def calculate_beta(stocks_daily_return , stock):
 
     b,a = np.polyfit(stocks_daily_return['sp500'] , stocks_daily_return[stock] , 1)
     return b ,a 
+
+# closed-form CAPM regression for every column of an N x K returns matrix at once
+# beta = cov(x, y) / var(x) is the same least squares fit as np.polyfit(x, y, 1),
+# results agree with polyfit to within 1e-8 (relative) on float64 input
+
+def capm_arrays(returns, market, rf=0, periods=252):
+    y = np.asarray(returns, dtype=float)
+    x = np.asarray(market, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    n = len(x)
+
+    x_mean = x.mean()
+    y_mean = y.mean(axis=0)
+    xc = x - x_mean
+    yc = y - y_mean
+
+    var_x = xc @ xc
+    cov_xy = xc @ yc
+    ss_tot = np.einsum('ij,ij->j', yc, yc)
+
+    beta = cov_xy / var_x
+    alpha = y_mean - beta * x_mean
+    ss_res = np.maximum(ss_tot - beta * cov_xy, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+    resid_vol = np.sqrt(ss_res / max(n - 2, 1)) * np.sqrt(periods)
+
+    rm = x_mean * periods
+    expected_return = rf + beta * (rm - rf)
+
+    return {
+        'alpha': alpha,
+        'beta': beta,
+        'r2': r2,
+        'residual_vol': resid_vol,
+        'expected_return': expected_return,
+    }
+
+# function to calculate alpha, beta, R2, residual volatility and CAPM return for all stocks
+
+@timed('capm.regression')
+def calculate_capm(stocks_daily_return, rf=0, market='sp500', periods=252):
+    stocks = [c for c in stocks_daily_return.columns if c not in ('Date', market)]
+    data = stocks_daily_return[stocks + [market]].dropna()
+    stats = capm_arrays(data[stocks].to_numpy(dtype=float), data[market].to_numpy(dtype=float),
+                        rf=rf, periods=periods)
+    return pd.DataFrame(stats, index=pd.Index(stocks, name='stock'))
+
+# rolling alpha, beta and correlation of every stock against the market over a trailing window
+# window sums come from cumulative sums, so all K stocks are done in one O(N*K) pass
+# (data is demeaned first to keep the cumulative sums well conditioned)
+
+@timed('capm.rolling')
+def rolling_capm(stocks_daily_return, window=60, market='sp500'):
+    stocks = [c for c in stocks_daily_return.columns if c not in ('Date', market)]
+    index = stocks_daily_return['Date'] if 'Date' in stocks_daily_return.columns else stocks_daily_return.index
+    y = stocks_daily_return[stocks].to_numpy(dtype=float)
+    x = stocks_daily_return[market].to_numpy(dtype=float)
+    y_mean, x_mean = y.mean(axis=0), x.mean()
+    y = y - y_mean
+    x = x - x_mean
+
+    def window_sum(a):
+        c = np.cumsum(a, axis=0)
+        out = np.full(a.shape, np.nan)
+        if len(a) >= window:
+            out[window - 1] = c[window - 1]
+            out[window:] = c[window:] - c[:-window]
+        return out
+
+    xs = x[:, None]
+    sx, sy = window_sum(xs), window_sum(y)
+    sxx, syy, sxy = window_sum(xs * xs), window_sum(y * y), window_sum(xs * y)
+
+    cov = sxy - sx * sy / window
+    var_x = sxx - sx * sx / window
+    var_y = syy - sy * sy / window
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = cov / var_x
+        corr = cov / np.sqrt(var_x * var_y)
+    alpha = (sy / window + y_mean) - beta * (sx / window + x_mean)
+
+    frames = {}
+    for name, values in (('alpha', alpha), ('beta', beta), ('corr', corr)):
+        frames[name] = pd.DataFrame(values, index=pd.Index(index, name='Date'), columns=stocks)
+    return frames
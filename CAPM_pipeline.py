@@ -0,0 +1,116 @@
+import argparse
+import datetime
+import sys
+import time
+
+import pandas as pd
+
+import CAPM_functions
+import CAPM_returns
+from pages.utils.alignment import align_prices
+from pages.utils.fetcher import fetch_many
+
+# fetch -> align -> returns -> beta -> expected return, without Streamlit
+# the CAPM page is a thin client over run_capm(); batch jobs and benchmarks can call it directly
+# usage: python CAPM_pipeline.py compute --tickers AAPL MSFT --years 3 [-o capm.csv | --format json]
+
+FORMATS = ('csv', 'json', 'parquet')
+TABLES = ('capm', 'prices', 'returns')
+
+
+class CAPMResult:
+    def __init__(self):
+        self.prices = None  # aligned closes, 'Date' column + one column per stock + 'sp500'
+        self.returns = None  # daily returns in percent, same layout from the second date on
+        self.capm = None  # alpha / beta / r2 / residual_vol / expected_return per stock
+        self.alignment = {}
+        self.errors = {}
+        self.timings = {}
+
+    @property
+    def stocks(self):
+        return list(self.capm.index)
+
+    def table(self, name='capm'):
+        if name == 'capm':
+            return self.capm
+        return getattr(self, name).set_index('Date')
+
+
+def run_capm(tickers, years=1, rf=0, end=None, policy='limit', market='sp500'):
+    result = CAPMResult()
+    end = pd.Timestamp(end or datetime.date.today())
+    start = end - pd.DateOffset(years=years)
+
+    t = time.perf_counter()
+    fetched = fetch_many([('fred', market)] + [('yahoo', ticker) for ticker in tickers],
+                         start=start.date(), end=end.date())
+    result.errors = fetched.errors
+    benchmark = fetched.get(market, source='fred')
+    if benchmark is None:
+        raise RuntimeError(f"benchmark download failed: {fetched.errors.get(('fred', market))}")
+    closes = {ticker: fetched.get(ticker) for ticker in tickers if fetched.get(ticker) is not None}
+    if not closes:
+        raise RuntimeError('no stock data could be loaded')
+    result.timings['fetch'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    prices, result.alignment = align_prices(closes, benchmark, policy=policy, benchmark_name=market)
+    result.prices = prices.reset_index()
+    result.timings['align'] = time.perf_counter() - t
+
+    # the first row of simple_returns is a 0 placeholder, not an observed return; left in, it
+    # biases every mean, covariance and regression downstream
+    t = time.perf_counter()
+    result.returns = CAPM_returns.simple_returns(result.prices, percent=True).iloc[1:].reset_index(drop=True)
+    result.timings['returns'] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    result.capm = CAPM_functions.calculate_capm(result.returns, rf=rf, market=market)
+    result.timings['capm'] = time.perf_counter() - t
+    return result
+
+
+def write_table(table, path=None, fmt=None):
+    fmt = fmt or (path.rsplit('.', 1)[-1] if path and '.' in path else 'csv')
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown format {fmt!r}, expected one of {FORMATS}')
+    if fmt == 'parquet':
+        if not path:
+            raise ValueError('parquet output needs a file path')
+        table.to_parquet(path)
+    elif fmt == 'json':
+        text = table.to_json(orient='index', date_format='iso', indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text + '\n')
+    else:
+        table.to_csv(path or sys.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CAPM beta and expected return without the web app.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    compute = sub.add_parser('compute', help='run the CAPM pipeline for a set of tickers')
+    compute.add_argument('--tickers', nargs='+', required=True)
+    compute.add_argument('--years', type=int, default=1)
+    compute.add_argument('--rf', type=float, default=0, help='annual risk-free rate in percent')
+    compute.add_argument('--end', help='last date (YYYY-MM-DD), defaults to today')
+    compute.add_argument('--policy', default='limit', choices=('drop', 'ffill', 'limit'))
+    compute.add_argument('--table', default='capm', choices=TABLES)
+    compute.add_argument('--format', choices=FORMATS)
+    compute.add_argument('-o', '--output', help='output file, stdout when omitted')
+    args = parser.parse_args(argv)
+
+    result = run_capm(args.tickers, args.years, args.rf, args.end, args.policy)
+    write_table(result.table(args.table), args.output, args.format)
+    if result.errors:
+        print(f'failed: {", ".join(t for _, t in result.errors)}', file=sys.stderr)
+    timings = ', '.join(f'{k} {v:.3f}s' for k, v in result.timings.items())
+    print(f'{len(result.stocks)} stocks, {result.alignment["rows"]} days ({timings})', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
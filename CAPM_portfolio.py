@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# mean-variance portfolios on the CAPM daily returns matrix
+# closed-form Markowitz solutions (short sales allowed, weights sum to 1):
+#   minimum variance  w = S^-1 1 / (1' S^-1 1)
+#   max Sharpe        w = S^-1 (mu - rf) / (1' S^-1 (mu - rf))
+#   frontier          w(m) = ((C - B m) S^-1 1 + (A m - B) S^-1 mu) / D
+# with A = 1' S^-1 1, B = 1' S^-1 mu, C = mu' S^-1 mu, D = A C - B^2
+# the tangency (max Sharpe) portfolio only exists when rf is below the minimum-variance return,
+# i.e. B - rf A > 0; otherwise the normalization flips sign and lands on the minimum-Sharpe
+# point, so max_sharpe is None and the 'Max Sharpe' row is left out
+# the covariance matrix is built and factorized once for all of them
+
+PERIODS = 252
+
+
+# annualized mean returns and covariance (fractions, not percent) from a daily returns frame
+def return_moments(stocks_daily_return, market='sp500', periods=PERIODS, percent=True):
+    stocks = [c for c in stocks_daily_return.columns if c not in ('Date', market)]
+    r = stocks_daily_return[stocks].dropna().to_numpy(dtype=float)
+    if percent:
+        r = r / 100
+    mu = r.mean(axis=0) * periods
+    cov = np.cov(r, rowvar=False) * periods
+    return stocks, mu, np.atleast_2d(cov)
+
+
+def optimize(mu, cov, rf=0.0, n_points=50, shrink=0.0):
+    mu = np.asarray(mu, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    k = len(mu)
+    if shrink:
+        # shrink towards the diagonal, keeps S invertible when there are more assets than days
+        cov = (1 - shrink) * cov + shrink * np.diag(np.diag(cov))
+
+    ones = np.ones(k)
+    factor = np.linalg.cholesky(cov)
+    inv = np.linalg.solve(factor.T, np.linalg.solve(factor, np.column_stack([ones, mu])))
+    inv_ones, inv_mu = inv[:, 0], inv[:, 1]
+
+    A = ones @ inv_ones
+    B = ones @ inv_mu
+    C = mu @ inv_mu
+    D = A * C - B * B
+
+    min_var = inv_ones / A
+    excess = inv_mu - rf * inv_ones
+    max_sharpe = excess / excess.sum() if excess.sum() > 0 else None
+
+    # frontier from the minimum-variance return up to the best single asset (or tangency)
+    m_lo = B / A
+    m_hi = max(mu.max(), m_lo if max_sharpe is None else mu @ max_sharpe, m_lo)
+    targets = np.linspace(m_lo, m_hi, n_points)
+    weights = (np.outer(C - B * targets, inv_ones) + np.outer(A * targets - B, inv_mu)) / D
+    variance = (A * targets ** 2 - 2 * B * targets + C) / D
+    vol = np.sqrt(np.maximum(variance, 0))
+
+    def stats(w):
+        ret = mu @ w
+        sd = np.sqrt(w @ cov @ w)
+        return ret, sd, (ret - rf) / sd
+
+    return {
+        'min_variance': (min_var, *stats(min_var)),
+        'max_sharpe': None if max_sharpe is None else (max_sharpe, *stats(max_sharpe)),
+        'frontier': (targets, vol, weights),
+    }
+
+
+# efficient frontier and the two portfolios for a CAPM returns frame
+def efficient_frontier(stocks_daily_return, rf=0.0, n_points=50, market='sp500', shrink=0.0):
+    stocks, mu, cov = return_moments(stocks_daily_return, market)
+    result = optimize(mu, cov, rf, n_points, shrink)
+
+    rows = {'Minimum Variance': result['min_variance'], 'Max Sharpe': result['max_sharpe']}
+    rows = {name: row for name, row in rows.items() if row is not None}
+    portfolios = pd.DataFrame([row[0] for row in rows.values()], index=list(rows), columns=stocks)
+    portfolios['Return'] = [row[1] for row in rows.values()]
+    portfolios['Volatility'] = [row[2] for row in rows.values()]
+    portfolios['Sharpe'] = [row[3] for row in rows.values()]
+
+    targets, vol, weights = result['frontier']
+    frontier = pd.DataFrame(weights, columns=stocks)
+    frontier.insert(0, 'Volatility', vol)
+    frontier.insert(0, 'Return', targets)
+    return portfolios, frontier
+
+
+def frontier_plot(portfolios, frontier, mu=None, vol=None, names=None):
+    fig = go.Figure()
+    fig.add_scatter(x=frontier['Volatility'] * 100, y=frontier['Return'] * 100,
+                    mode='lines', name='Efficient Frontier')
+    if mu is not None:
+        fig.add_scatter(x=np.asarray(vol) * 100, y=np.asarray(mu) * 100, mode='markers+text',
+                        text=names, textposition='top center', name='Stocks')
+    for name, row in portfolios.iterrows():
+        fig.add_scatter(x=[row['Volatility'] * 100], y=[row['Return'] * 100], mode='markers',
+                        marker=dict(size=12, symbol='star'), name=name)
+    fig.update_layout(
+        width=800,
+        height=500,
+        margin=dict(l=20, r=20, t=80, b=20),
+        xaxis_title="Annualized Volatility (%)",
+        yaxis_title="Annualized Return (%)",
+        template='plotly_white'
+    )
+    return fig
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# return utilities on whole price matrices
+# every function takes an (N, K) array or a DataFrame (a 'Date' column, if present, is passed
+# through untouched) and returns a new object, inputs are never modified
+# - the first row of a returns matrix is 0, so it lines up with the price dates
+# - dtype=np.float32 halves memory for large universes, results stay float32 end to end
+# - percent=True gives returns in percent like the CAPM page uses
+
+PERIODS = 252
+
+
+def _split(data, dtype):
+    if isinstance(data, pd.DataFrame):
+        cols = [c for c in data.columns if c != 'Date']
+        return data[cols].to_numpy(dtype=dtype), cols
+    return np.asarray(data, dtype=dtype), None
+
+
+def _join(data, values, cols):
+    if cols is None:
+        return values
+    out = pd.DataFrame(values, index=data.index, columns=cols)
+    if 'Date' in data.columns:
+        out.insert(0, 'Date', data['Date'])
+    return out
+
+
+def _first_valid(values):
+    # first non-NaN row of every column (row 0 when a column is all NaN)
+    valid = ~np.isnan(values)
+    rows = valid.argmax(axis=0)
+    return values[rows, np.arange(values.shape[1])] if values.ndim == 2 else values[rows]
+
+
+def simple_returns(prices, percent=False, dtype=np.float64):
+    values, cols = _split(prices, dtype)
+    out = np.zeros_like(values)
+    np.divide(values[1:] - values[:-1], values[:-1], out=out[1:])
+    if percent:
+        out *= 100
+    return _join(prices, out, cols)
+
+
+def log_returns(prices, percent=False, dtype=np.float64):
+    values, cols = _split(prices, dtype)
+    out = np.zeros_like(values)
+    logs = np.log(values)
+    np.subtract(logs[1:], logs[:-1], out=out[1:])
+    if percent:
+        out *= 100
+    return _join(prices, out, cols)
+
+
+# rf is annual and in the same units as the returns (percent if the returns are in percent)
+def excess_returns(returns, rf=0, periods=PERIODS, dtype=np.float64):
+    values, cols = _split(returns, dtype)
+    out = values - values.dtype.type(rf / periods)
+    out[0] = 0
+    return _join(returns, out, cols)
+
+
+# growth since the first row: compounded for simple returns, summed for log returns
+def cumulative_returns(returns, log=False, percent=False, dtype=np.float64):
+    values, cols = _split(returns, dtype)
+    if percent:
+        values = values / 100
+    if log:
+        out = np.cumsum(values, axis=0)
+    else:
+        out = np.cumprod(1 + values, axis=0) - 1
+    if percent:
+        out *= 100
+    return _join(returns, out, cols)
+
+
+# prices divided by each column's first valid price, times base
+def rebase(prices, base=1.0, dtype=np.float64):
+    values, cols = _split(prices, dtype)
+    out = values / _first_valid(values) * values.dtype.type(base)
+    return _join(prices, out, cols)
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+import CAPM_portfolio
+
+# portfolio Value-at-Risk and Expected Shortfall (CVaR) on the CAPM daily returns frame
+# - historical: empirical quantile of the realized portfolio returns
+# - parametric: normal with the sample mean / covariance
+# - monte carlo: correlated shocks z @ L' through the Cholesky factor of the covariance,
+#   generated in chunks of at most CHUNK_BYTES so a million paths never hold a
+#   (paths x stocks) matrix in memory; chunks can be spread over a process pool
+# losses are reported as positive fractions of portfolio value over `horizon` trading days
+# (multi-day returns are the sum of daily returns, i.e. log-return style aggregation)
+
+ALPHAS = (0.95, 0.99)
+N_PATHS = 100_000
+CHUNK_BYTES = 32 * 2 ** 20  # shocks per chunk, in bytes of float64
+
+
+def var_cvar(pnl, alpha):
+    pnl = np.asarray(pnl, dtype=float)
+    cutoff = np.quantile(pnl, 1 - alpha)
+    tail = pnl[pnl <= cutoff]
+    return -cutoff, -tail.mean()
+
+
+def historical(returns, weights, alpha=0.95, horizon=1):
+    pnl = np.asarray(returns, dtype=float) @ weights
+    if horizon > 1:
+        # overlapping horizon sums from a cumulative sum
+        c = np.concatenate([[0.0], np.cumsum(pnl)])
+        pnl = c[horizon:] - c[:-horizon]
+    return var_cvar(pnl, alpha)
+
+
+def parametric(mu, cov, weights, alpha=0.95, horizon=1):
+    mean = (mu @ weights) * horizon
+    sd = np.sqrt(weights @ cov @ weights * horizon)
+    z = NormalDist().inv_cdf(1 - alpha)
+    var = -(mean + z * sd)
+    cvar = -(mean - sd * NormalDist().pdf(z) / (1 - alpha))
+    return var, cvar
+
+
+def chunk_rows(n_stocks, chunk_bytes=CHUNK_BYTES):
+    return max(1, chunk_bytes // (8 * max(n_stocks, 1)))
+
+
+# portfolio returns of one chunk of paths; t shocks are scaled to unit variance so the
+# covariance is the same as the normal case and only the tails get fatter
+def _simulate_chunk(args):
+    mu, factor, weights, rows, horizon, dist, dof, seed = args
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((rows, len(mu)))
+    if dist == 't':
+        z *= np.sqrt((dof - 2) / rng.chisquare(dof, (rows, 1)))
+    # (z @ L') @ w == z @ (L' w), so the (rows x stocks) shock matrix is never correlated explicitly
+    return z @ (factor.T @ weights) * np.sqrt(horizon) + (mu @ weights) * horizon
+
+
+def simulate(mu, cov, weights, n_paths=N_PATHS, horizon=1, dist='normal', dof=5, seed=0,
+             chunk_bytes=CHUNK_BYTES, max_workers=1):
+    mu = np.asarray(mu, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    factor = np.linalg.cholesky(np.asarray(cov, dtype=float))
+    rows = chunk_rows(len(mu), chunk_bytes)
+    sizes = [rows] * (n_paths // rows) + ([n_paths % rows] if n_paths % rows else [])
+    # one independent stream per chunk, the result doesn't depend on max_workers
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(mu, factor, weights, size, horizon, dist, dof, s) for size, s in zip(sizes, seeds)]
+
+    pnl = np.empty(n_paths)
+    if max_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunks = pool.map(_simulate_chunk, jobs)
+            start = 0
+            for chunk in chunks:
+                pnl[start:start + len(chunk)] = chunk
+                start += len(chunk)
+    else:
+        start = 0
+        for job in jobs:
+            chunk = _simulate_chunk(job)
+            pnl[start:start + len(chunk)] = chunk
+            start += len(chunk)
+    return pnl
+
+
+def monte_carlo(mu, cov, weights, alpha=0.95, horizon=1, **kwargs):
+    return var_cvar(simulate(mu, cov, weights, horizon=horizon, **kwargs), alpha)
+
+
+# VaR / CVaR table (rows: method, columns: VaR/CVaR at each confidence) for a CAPM returns frame
+# every row counts as an observation, pass returns without the 0 placeholder row (run_capm does)
+def risk_report(stocks_daily_return, weights=None, alphas=ALPHAS, horizon=1, n_paths=N_PATHS,
+                dist='normal', market='sp500', seed=0, max_workers=1):
+    stocks, mu, cov = CAPM_portfolio.return_moments(stocks_daily_return, market, periods=1)
+    weights = np.full(len(stocks), 1 / len(stocks)) if weights is None else np.asarray(weights, dtype=float)
+    returns = stocks_daily_return[stocks].dropna().to_numpy(dtype=float) / 100
+    pnl = simulate(mu, cov, weights, n_paths, horizon, dist, seed=seed, max_workers=max_workers)
+
+    rows = {'Historical': [], 'Parametric': [], 'Monte Carlo': []}
+    for alpha in alphas:
+        rows['Historical'].extend(historical(returns, weights, alpha, horizon))
+        rows['Parametric'].extend(parametric(mu, cov, weights, alpha, horizon))
+        rows['Monte Carlo'].extend(var_cvar(pnl, alpha))
+    columns = [f'{name} {alpha:.0%}' for alpha in alphas for name in ('VaR', 'CVaR')]
+    return pd.DataFrame.from_dict(rows, orient='index', columns=columns)
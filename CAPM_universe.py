@@ -0,0 +1,154 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+import CAPM_functions
+from pages.utils.alignment import align_prices
+from pages.utils.fetcher import fetch_many
+
+# precomputed alpha / beta / R2 / CAPM return for a whole universe over several lookbacks
+# stored as one parquet file indexed by (horizon, ticker) so the page can do top-N and
+# per-ticker lookups without touching the network
+# usage: python CAPM_universe.py build [--tickers-file FILE] [--horizons 1 3 5]
+#        python CAPM_universe.py top --horizon 1 -n 10
+
+INDEX_PATH = os.environ.get('BETA_INDEX_PATH', os.path.join('.price_store', 'beta_index.parquet'))
+HORIZONS = (1, 3, 5)  # years
+SP500_URL = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+
+
+def sp500_tickers():
+    table = pd.read_html(SP500_URL)[0]
+    return table['Symbol'].str.replace('.', '-', regex=False).tolist()
+
+
+# close prices of every ticker on the benchmark's trading days, short gaps carried forward
+def load_prices(tickers, years=max(HORIZONS)):
+    start = pd.Timestamp.today().normalize() - pd.DateOffset(years=years)
+    fetched = fetch_many([('fred', 'sp500')] + [('yahoo', t) for t in tickers], start=start)
+    benchmark = fetched.get('sp500', source='fred')
+    if benchmark is None:
+        raise RuntimeError(f"benchmark download failed: {fetched.errors.get(('fred', 'sp500'))}")
+    closes = {t: df['Close'] for (source, t), df in fetched.data.items() if source == 'yahoo'}
+    # keep leading NaN so newer listings are left out of the longer horizons
+    prices, _ = align_prices(closes, benchmark, policy='limit', dropna=False)
+    return prices, fetched.errors
+
+
+def compute_index(prices, horizons=HORIZONS, rf=0, periods=252):
+    returns = prices.pct_change().iloc[1:] * 100
+    as_of = returns.index[-1]
+    rows = []
+    for years in horizons:
+        window = returns[returns.index > as_of - pd.DateOffset(years=years)]
+        # tickers with a full window for this horizon, newer listings only show up in shorter ones
+        complete = window.columns[window.notna().all().to_numpy()].drop('sp500', errors='ignore')
+        if len(complete) == 0 or len(window) < 20:
+            continue
+        stats = CAPM_functions.capm_arrays(window[complete].to_numpy(), window['sp500'].to_numpy(),
+                                           rf=rf, periods=periods)
+        frame = pd.DataFrame(stats, index=pd.Index(complete, name='ticker'))
+        frame['horizon'] = years
+        frame['n_obs'] = len(window)
+        rows.append(frame.reset_index())
+    if not rows:
+        raise ValueError('not enough overlapping data to compute any horizon')
+    index = pd.concat(rows, ignore_index=True)
+    index['as_of'] = as_of
+    index = index.astype({'horizon': 'int8', 'n_obs': 'int32'})
+    return index.set_index(['horizon', 'ticker']).sort_index()
+
+
+def write_index(index, path=INDEX_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    index.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def build_index(tickers=None, horizons=HORIZONS, path=INDEX_PATH):
+    tickers = sp500_tickers() if tickers is None else tickers
+    prices, errors = load_prices(tickers, max(horizons))
+    index = compute_index(prices, horizons)
+    write_index(index, path)
+    return index, errors
+
+
+# ---------------------- LOOKUPS ----------------------
+_loaded = {}
+
+
+def load_index(path=INDEX_PATH):
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if _loaded.get(path, (None,))[0] != mtime:
+        _loaded[path] = (mtime, pd.read_parquet(path, memory_map=True))
+    return _loaded[path][1]
+
+
+def top_n(index, horizon, n=10, highest=True, column='beta'):
+    frame = index.xs(horizon, level='horizon')
+    return frame.nlargest(n, column) if highest else frame.nsmallest(n, column)
+
+
+def lookup(index, ticker):
+    try:
+        return index.xs(ticker.upper(), level='ticker')
+    except KeyError:
+        return None
+
+
+# rebuilds only when the benchmark has bars newer than the index; the price store
+# fetches just those new bars, so a daily refresh is a small download plus one matrix pass
+def refresh_index(tickers=None, horizons=HORIZONS, path=INDEX_PATH):
+    index = load_index(path)
+    if index is not None:
+        from pages.utils.price_store import get_prices
+        latest = get_prices('sp500', source='fred').dropna().index[-1]
+        if index['as_of'].iloc[0] >= latest:
+            return index, {}
+        if tickers is None:
+            tickers = index.index.get_level_values('ticker').unique().tolist()
+    return build_index(tickers, horizons, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Universe-wide CAPM beta index.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='download prices and (re)build the index')
+    build.add_argument('--tickers', nargs='*')
+    build.add_argument('--tickers-file')
+    build.add_argument('--horizons', nargs='*', type=int, default=list(HORIZONS))
+    build.add_argument('--full', action='store_true', help='rebuild even if the index is current')
+    top = sub.add_parser('top', help='print the highest / lowest beta tickers')
+    top.add_argument('--horizon', type=int, default=HORIZONS[0])
+    top.add_argument('-n', type=int, default=10)
+    top.add_argument('--lowest', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        tickers = args.tickers or None
+        if args.tickers_file:
+            with open(args.tickers_file) as f:
+                tickers = (tickers or []) + f.read().split()
+        start = time.perf_counter()
+        if args.full:
+            index, errors = build_index(tickers, args.horizons)
+        else:
+            index, errors = refresh_index(tickers, args.horizons)
+        print(f'{index.index.get_level_values("ticker").nunique()} tickers, horizons {sorted(set(index.index.get_level_values("horizon")))}, '
+              f'as of {index["as_of"].iloc[0].date()} in {time.perf_counter() - start:.1f}s -> {INDEX_PATH}')
+        if errors:
+            print(f'failed: {", ".join(t for _, t in errors)}')
+    else:
+        index = load_index()
+        if index is None:
+            parser.error(f'no index at {INDEX_PATH}, run build first')
+        print(top_n(index, args.horizon, args.n, highest=not args.lowest).drop(columns='as_of').round(3).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils import backtest
+from pages.utils.forecasting import search_order
+from pages.utils.stationarity import find_differencing_order
+from synthetic import make_prices
+
+# 5-year walk-forward with weekly origins: state updates (extend) vs re-estimating at every origin
+# usage: python benchmarks/bench_backtest.py [years]
+
+warnings.filterwarnings('ignore')
+
+
+def run(years=5):
+    series = make_prices(years * 252 + 6, seed=4).rolling(7).mean().dropna()
+    values = series.to_numpy()
+    d = find_differencing_order(values[:backtest.MIN_TRAIN])[0]
+    order = search_order(values[:backtest.MIN_TRAIN], d, max_workers=1)
+    print(f'{len(series)} bars, ARIMA{order}, {len(backtest.origins(len(series)))} weekly origins')
+
+    for label, refit_every, workers in (('refit every origin', 1, 1),
+                                        (f'extend, refit every {backtest.REFIT_EVERY}', backtest.REFIT_EVERY, 1),
+                                        (f'extend, {backtest.MAX_WORKERS} workers', backtest.REFIT_EVERY, backtest.MAX_WORKERS)):
+        start = time.perf_counter()
+        frame = backtest.walk_forward(series, order=order, refit_every=refit_every, max_workers=workers)
+        print(f'{label:28s}: {time.perf_counter() - start:6.1f}s  '
+              f'median rmse {frame["rmse"].median():.3f}  median mape {frame["mape"].median():.2f}%')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault('PRICE_STORE_DIR', tempfile.mkdtemp())
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils import price_store
+from pages.utils.batch_forecast import load_batch_forecast, run_batch, write_batch
+from synthetic import SyntheticFetcher
+
+# tickers per minute of the batch forecaster for 1..cpu_count workers on synthetic prices
+# usage: python benchmarks/bench_batch_forecast.py [tickers]
+
+
+def run(n_tickers=8):
+    price_store.set_fetcher('yahoo', SyntheticFetcher())
+    tickers = [f'SYN{i}' for i in range(n_tickers)]
+    out_dir = tempfile.mkdtemp()
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        scores, forecasts, elapsed = run_batch(tickers, max_workers=workers)
+        print(f'{workers:2d} workers: {n_tickers / elapsed * 60:6.1f} tickers/min '
+              f'({(scores["status"] == "done").sum()}/{n_tickers} ok)')
+        workers *= 2
+    write_batch(scores, forecasts, out_dir)
+    rmse, history, forecast = load_batch_forecast(tickers[0], out_dir)
+    print(f'read back {tickers[0]}: rmse={rmse}, {len(history)} history rows, {len(forecast)} forecast rows')
+
+
+if __name__ == '__main__':
+    run(*[int(a) for a in sys.argv[1:]])
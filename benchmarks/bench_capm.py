@@ -0,0 +1,40 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import CAPM_functions
+from synthetic import make_returns
+
+# compares the closed-form CAPM engine against one np.polyfit per ticker
+
+
+def run(n_days=2520, n_tickers=500):
+    df = make_returns(n_days, n_tickers)
+
+    start = time.perf_counter()
+    loop_beta = {}
+    loop_alpha = {}
+    for stock in df.columns:
+        if stock != 'sp500':
+            loop_beta[stock], loop_alpha[stock] = CAPM_functions.calculate_beta(df, stock)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    capm_df = CAPM_functions.calculate_capm(df)
+    fast_time = time.perf_counter() - start
+
+    beta_err = np.max(np.abs(capm_df['beta'] - pd.Series(loop_beta)))
+    alpha_err = np.max(np.abs(capm_df['alpha'] - pd.Series(loop_alpha)))
+    print(f'{n_tickers} tickers x {n_days} days')
+    print(f'polyfit loop : {loop_time * 1000:.1f} ms')
+    print(f'closed form  : {fast_time * 1000:.1f} ms ({loop_time / fast_time:.0f}x)')
+    print(f'max |beta diff| = {beta_err:.2e}, max |alpha diff| = {alpha_err:.2e}')
+    assert beta_err < 1e-8 and alpha_err < 1e-8
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,35 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils import plotly_figure
+from synthetic import make_ohlc
+
+# figure JSON size and build time with and without downsampling on a 40-year daily history
+
+
+def measure(build):
+    start = time.perf_counter()
+    fig = build()
+    size = len(fig.to_json())
+    return time.perf_counter() - start, size
+
+
+def run():
+    df = make_ohlc()
+    charts = {
+        'close_chart': lambda width: plotly_figure.close_chart(df, ' ', width=width),
+        'candlestick': lambda width: plotly_figure.candlestick(df, ' ', width=width),
+        'Moving_average': lambda width: plotly_figure.Moving_average(df, ' ', width=width),
+    }
+    print(f'{len(df)} bars (period=max)')
+    for name, build in charts.items():
+        full_time, full_size = measure(lambda: build(None))
+        small_time, small_size = measure(lambda: build(plotly_figure.CHART_WIDTH))
+        print(f'{name:15s} full: {full_size / 1024:8.1f} KiB {full_time * 1000:7.1f} ms | '
+              f'downsampled: {small_size / 1024:7.1f} KiB {small_time * 1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,44 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils.fetcher import fetch_many
+
+# simulates network latency with a fake provider and compares the serial loop
+# against the concurrent fetch layer, including one symbol that always fails
+
+LATENCY = 0.2
+
+
+def fake_fetch(ticker, source='yahoo', start=None, end=None):
+    time.sleep(LATENCY)
+    if ticker == 'BAD':
+        raise ValueError('unknown symbol')
+    index = pd.bdate_range('2020-01-01', periods=250, name='Date')
+    return pd.DataFrame({'Close': np.linspace(1, 2, len(index))}, index=index)
+
+
+def run(n_tickers=20):
+    items = [('fred', 'sp500')] + [('yahoo', f'T{i}') for i in range(n_tickers)] + [('yahoo', 'BAD')]
+
+    start = time.perf_counter()
+    for source, ticker in items:
+        try:
+            fake_fetch(ticker, source=source)
+        except ValueError:
+            pass
+    serial = time.perf_counter() - start
+
+    result = fetch_many(items, fetch=fake_fetch, retries=1, backoff=0.05)
+    print(f'{len(items)} series, {LATENCY * 1000:.0f} ms latency each')
+    print(f'serial loop : {serial:.2f}s')
+    print(f'concurrent  : {result.elapsed:.2f}s ({serial / result.elapsed:.1f}x)')
+    print(f'loaded {len(result.data)}, failed {dict(result.errors)}')
+
+
+if __name__ == '__main__':
+    run()
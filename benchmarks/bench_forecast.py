@@ -0,0 +1,48 @@
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils import Model_train
+from pages.utils.forecasting import ForecastService, _fit
+from synthetic import make_prices
+
+# fit time and holdout RMSE: fixed ARIMA(30, d, 30) vs AIC-searched order with the model cache
+
+warnings.filterwarnings('ignore')
+
+
+def rmse(actual, predicted):
+    return float(np.sqrt(np.mean((np.ravel(actual) - np.ravel(predicted)) ** 2)))
+
+
+def run(skip_fixed=False):
+    rolling_price = Model_train.get_rolling_mean(make_prices())
+    d = Model_train.get_differencing_order(rolling_price)
+    scaled, _ = Model_train.scaling(rolling_price)
+    train, test = scaled[:-30], scaled[-30:]
+
+    if not skip_fixed:
+        start = time.perf_counter()
+        fixed = _fit(train, (30, d, 30)).get_forecast(30).predicted_mean
+        _fit(scaled, (30, d, 30))
+        print(f'ARIMA(30,{d},30)     : {time.perf_counter() - start:7.2f}s  rmse={rmse(test, fixed):.3f}')
+
+    service = ForecastService()
+    start = time.perf_counter()
+    order = service.order(train, d, 'SYN')
+    searched = service.forecast(train, order, 'SYN')
+    service.forecast(scaled, order, 'SYN')
+    print(f'search + fit {order}: {time.perf_counter() - start:7.2f}s  rmse={rmse(test, searched):.3f}')
+
+    start = time.perf_counter()
+    service.forecast(train, order, 'SYN')
+    service.forecast(scaled, order, 'SYN')
+    print(f'cached rerun        : {time.perf_counter() - start:7.2f}s  {service.stats()}')
+
+
+if __name__ == '__main__':
+    run(skip_fixed='--skip-fixed' in sys.argv)
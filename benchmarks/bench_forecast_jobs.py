@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+os.environ.setdefault('PRICE_STORE_DIR', tempfile.mkdtemp())
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from pages.utils import price_store
+from pages.utils.forecast_jobs import ForecastJobQueue
+from synthetic import SyntheticFetcher
+
+# simulates N concurrent page sessions against the forecast job queue with an offline price source
+# usage: python benchmarks/bench_forecast_jobs.py [sessions] [distinct tickers]
+
+
+def session(queue, ticker, timings):
+    start = time.perf_counter()
+    job_id = queue.submit(ticker)
+    submitted = time.perf_counter() - start
+    while queue.status(job_id)['status'] in ('queued', 'running'):
+        time.sleep(0.1)
+    timings.append((submitted, time.perf_counter() - start, queue.status(job_id)['status']))
+
+
+def run(n_sessions=20, n_tickers=4):
+    price_store.set_fetcher('yahoo', SyntheticFetcher())
+    queue = ForecastJobQueue()
+    timings = []
+    threads = [threading.Thread(target=session, args=(queue, f'SYN{i % n_tickers}', timings))
+               for i in range(n_sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    stats = queue.stats()
+    queue.shutdown()
+
+    submit = np.array([t[0] for t in timings]) * 1000
+    total = np.array([t[1] for t in timings])
+    print(f'{n_sessions} sessions, {n_tickers} distinct tickers, {queue.max_workers} workers')
+    print(f'submit latency ms : p50={np.percentile(submit, 50):.2f} p95={np.percentile(submit, 95):.2f}')
+    print(f'time to result s  : p50={np.percentile(total, 50):.2f} max={total.max():.2f} (wall {wall:.2f})')
+    print(f'queue stats       : {stats}')
+    print(f'statuses          : {sorted(set(t[2] for t in timings))}')
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
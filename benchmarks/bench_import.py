@@ -0,0 +1,81 @@
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+# cold import time of each page's imports, measured with python -X importtime in a fresh
+# interpreter; fails (exit 1) when a page is over budget or pulls in a module that should
+# only be imported at the point of use, or any module in the repo imports a dropped dependency
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES = ['CAPM_Return.py', 'pages/Stock_analysis.py', 'pages/Stock_Prediction.py', 'pages/1_Trading_app.py']
+BUDGET = 2.0  # seconds per page, streamlit and pandas alone are about 1s here
+LAZY = ('statsmodels', 'sklearn', 'pandas_datareader', 'yfinance', 'scipy')
+REMOVED = ('ta',)  # no longer in requirements.txt, the indicators are computed in pages/utils/indicators.py
+
+
+def page_imports(path):
+    tree = ast.parse((ROOT / path).read_text())
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+    return '\n'.join(lines)
+
+
+def removed_imports(root=ROOT):
+    found = []
+    for path in sorted(root.rglob('*.py')):
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                names = [node.module or '']
+            else:
+                continue
+            found += [(path.relative_to(root), name) for name in names if name.split('.')[0] in REMOVED]
+    return found
+
+
+def import_times(code):
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us), len(name) - len(name.lstrip()))
+    return modules
+
+
+def report(path, budget, top=8):
+    modules = import_times(page_imports(path))
+    total = sum(self_us for self_us, _, _ in modules.values()) / 1e6
+    lazy = sorted({name.split('.')[0] for name in modules} & set(LAZY))
+    print(f'{path}: {total:.2f}s, {len(modules)} modules' + (f', eager: {", ".join(lazy)}' if lazy else ''))
+    # heaviest top-level imports (importtime indents nested imports by two spaces per level)
+    roots = [(cum, name) for name, (_, cum, depth) in modules.items() if depth <= 1]
+    for cum, name in sorted(roots, reverse=True)[:top]:
+        print(f'    {cum / 1e6:6.3f}s  {name}')
+    return total <= budget and not lazy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='*', default=PAGES)
+    parser.add_argument('--budget', type=float, default=BUDGET)
+    args = parser.parse_args(argv)
+    ok = all([report(page, args.budget) for page in args.pages])
+    for path, name in removed_imports():
+        print(f'{path}: imports {name}, which is not a dependency any more')
+        ok = False
+    print('OK' if ok else f'FAIL: over {args.budget:.1f}s or heavy modules imported eagerly')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
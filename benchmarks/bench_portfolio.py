@@ -0,0 +1,22 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import CAPM_portfolio
+from synthetic import make_returns
+
+# speed of the closed-form optimizer on large universes
+# (closed form vs SLSQP and the frontier checks are asserted in tests/test_portfolio.py)
+
+
+def run():
+    for n_assets in (100, 500):
+        df = make_returns(2520, n_assets)
+        start = time.perf_counter()
+        portfolios, frontier = CAPM_portfolio.efficient_frontier(df, n_points=100)
+        print(f'{n_assets} assets x 2520 days, 100 frontier points: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    run()
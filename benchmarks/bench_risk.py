@@ -0,0 +1,52 @@
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import CAPM_portfolio
+import CAPM_risk
+from synthetic import make_returns
+
+# Monte Carlo VaR throughput and peak memory against path count, chunk size and workers
+# usage: python benchmarks/bench_risk.py [stocks]
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    took = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return took, peak
+
+
+def run(n_stocks=50):
+    df = make_returns(2520, n_stocks, seed=2)
+    _, mu, cov = CAPM_portfolio.return_moments(df, periods=1)
+    weights = np.full(n_stocks, 1 / n_stocks)
+    print(f'{n_stocks} stocks, normal shocks, 1-day horizon')
+
+    for n_paths in (10 ** 4, 10 ** 5, 10 ** 6, 4 * 10 ** 6):
+        for chunk_mb in (8, 32):
+            took, peak = measure(lambda: CAPM_risk.simulate(mu, cov, weights, n_paths,
+                                                            chunk_bytes=chunk_mb * 2 ** 20))
+            print(f'{n_paths:>9,d} paths  chunk {chunk_mb:2d} MiB : {took:6.2f}s '
+                  f'{n_paths / took / 1e6:6.2f} M paths/s  peak {peak / 2 ** 20:7.1f} MiB')
+
+    # all shocks in one block, for comparison with the chunked peak
+    n_paths = 10 ** 6
+    took, peak = measure(lambda: CAPM_risk.simulate(mu, cov, weights, n_paths, chunk_bytes=10 ** 12))
+    print(f'{n_paths:>9,d} paths  one block      : {took:6.2f}s peak {peak / 2 ** 20:7.1f} MiB')
+
+    for workers in (1, 2, 4):
+        start = time.perf_counter()
+        CAPM_risk.simulate(mu, cov, weights, 4 * 10 ** 6, max_workers=workers)
+        print(f'4,000,000 paths  {workers} worker(s)    : {time.perf_counter() - start:6.2f}s')
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,40 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import CAPM_functions
+from synthetic import make_returns
+
+# rolling beta via cumulative sums vs one np.polyfit per window per ticker
+
+
+def naive_rolling_beta(df, stock, window):
+    x = df['sp500'].to_numpy()
+    y = df[stock].to_numpy()
+    return np.array([np.polyfit(x[i - window + 1:i + 1], y[i - window + 1:i + 1], 1)[0]
+                     for i in range(window - 1, len(df))])
+
+
+def run(n_days=2520, n_tickers=500, window=252, naive_tickers=5):
+    df = make_returns(n_days, n_tickers)
+
+    start = time.perf_counter()
+    rolling = CAPM_functions.rolling_capm(df, window=window)
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive = {stock: naive_rolling_beta(df, stock, window) for stock in df.columns[:naive_tickers]}
+    naive_time = (time.perf_counter() - start) / naive_tickers * n_tickers
+
+    err = max(np.max(np.abs(rolling['beta'][stock].to_numpy()[window - 1:] - beta)) for stock, beta in naive.items())
+    print(f'{n_tickers} tickers x {n_days} days, window {window}')
+    print(f'naive polyfit (extrapolated from {naive_tickers} tickers): {naive_time:.2f}s')
+    print(f'cumulative sums: {fast_time * 1000:.1f} ms ({naive_time / fast_time:.0f}x)')
+    print(f'max |beta diff| = {err:.2e}')
+
+
+if __name__ == '__main__':
+    run()
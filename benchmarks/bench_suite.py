@@ -0,0 +1,144 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+import CAPM_functions
+import CAPM_returns
+from pages.utils import forecasting, indicators, plotly_figure, stationarity
+from pages.utils.alignment import align_prices
+from synthetic import make_market
+
+# times every pipeline stage on offline synthetic data across a few universe sizes and writes
+# the medians to JSON; --compare flags stages that got slower than a previous run
+# usage: python benchmarks/bench_suite.py [--sizes small medium] [-o results.json]
+#        python benchmarks/bench_suite.py --compare baseline.json [--tolerance 0.25]
+
+warnings.filterwarnings('ignore')
+
+SIZES = {
+    'small': {'years': 1, 'tickers': 10},
+    'medium': {'years': 5, 'tickers': 100},
+    'large': {'years': 20, 'tickers': 500},
+}
+REPEAT = 5
+TOLERANCE = 0.25  # slowdown ratio that counts as a regression
+ARIMA_BARS = 250  # forecasting works on about a year of bars whatever the universe size
+
+
+def prepare(years, tickers, seed=0):
+    stocks, benchmark = make_market(tickers, years, gap_rate=0.002, holiday_rate=0.01, seed=seed)
+    prices, _ = align_prices(stocks, benchmark, policy='limit')
+    prices = prices.reset_index()
+    returns = CAPM_returns.simple_returns(prices, percent=True)
+    ohlc = stocks['T0']
+    return {'stocks': stocks, 'benchmark': benchmark, 'prices': prices, 'returns': returns, 'ohlc': ohlc}
+
+
+def stages(data):
+    closes = data['prices'].drop(columns=['Date', 'sp500']).to_numpy()
+    series = data['ohlc']['Close'].to_numpy()[-ARIMA_BARS:]
+    return {
+        'align': lambda: align_prices(data['stocks'], data['benchmark'], policy='limit'),
+        'returns': lambda: CAPM_returns.simple_returns(data['prices'], percent=True),
+        'beta': lambda: CAPM_functions.calculate_capm(data['returns']),
+        'rolling_beta': lambda: CAPM_functions.rolling_capm(data['returns'], window=60),
+        'indicators': lambda: indicators.compute_indicators(data['ohlc']['Close']),
+        'adf': lambda: stationarity.find_differencing_order(series),
+        'adf_universe': lambda: stationarity.differencing_orders(closes),
+        'arima_fit': lambda: forecasting._fit(series, (1, 1, 1)),
+        'figure_build': lambda: plotly_figure.candlestick(data['ohlc'], ' ').to_json(),
+        'figure_indicators': lambda: plotly_figure.RSI(data['ohlc'], ' ').to_json(),
+        # rerun with the same ticker and period: figure cache hit plus the to_dict Streamlit does
+        'figure_rerun': lambda: plotly_figure.candlestick(data['ohlc'], ' ', ticker='BENCH').to_dict(),
+    }
+
+
+def measure(fn, repeat=REPEAT):
+    fn()  # warm-up, keeps lazy imports and first-call allocations out of the numbers
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), float(np.min(times))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(sizes, only=None, repeat=REPEAT):
+    results = []
+    for size in sizes:
+        config = SIZES[size]
+        data = prepare(config['years'], config['tickers'])
+        n_days = len(data['prices'])
+        for stage, fn in stages(data).items():
+            if only and stage not in only:
+                continue
+            median, best = measure(fn, repeat)
+            results.append({'stage': stage, 'size': size, 'days': n_days, 'tickers': config['tickers'],
+                            'median': median, 'min': best})
+            print(f'{size:7s} {stage:18s} {n_days:6d} days x {config["tickers"]:4d}  '
+                  f'median {median * 1000:9.2f} ms  min {best * 1000:9.2f} ms')
+    return {
+        'meta': {'commit': git_commit(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                 'machine': platform.machine(), 'repeat': repeat},
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    before = {(r['stage'], r['size']): r['median'] for r in baseline['results']}
+    regressions = []
+    print(f"\nvs {baseline['meta'].get('commit')} (tolerance {tolerance:.0%})")
+    for r in current['results']:
+        old = before.get((r['stage'], r['size']))
+        if old is None:
+            continue
+        ratio = r['median'] / old if old else float('inf')
+        flag = 'SLOWER' if ratio > 1 + tolerance else 'faster' if ratio < 1 - tolerance else ''
+        print(f"{r['size']:7s} {r['stage']:18s} {old * 1000:9.2f} -> {r['median'] * 1000:9.2f} ms  {ratio:5.2f}x {flag}")
+        if flag == 'SLOWER':
+            regressions.append((r['stage'], r['size'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='*', default=['small', 'medium'], choices=list(SIZES))
+    parser.add_argument('--stages', nargs='*')
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('-o', '--output', help='write results JSON here')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.stages, args.repeat)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2))
+    if args.compare:
+        regressions = compare(current, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print(f'{len(regressions)} regression(s)')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
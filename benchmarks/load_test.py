@@ -0,0 +1,245 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+from synthetic import SyntheticFetcher
+
+# multi-user load test: simulated sessions drive the pages concurrently through AppTest, one
+# thread per session like the Streamlit server, against a local deterministic backend
+# - yahoo / fred downloads and the ticker info call are served by SyntheticFetcher, with an
+#   optional fixed latency per call; store, info and forecast directories are fresh temp dirs
+# - each session loads the page, then switches ticker `runs` times (closed loop, `think`
+#   seconds between runs); all sessions start together
+# - every (page, sessions) level runs in its own process, after one untimed warm-up session,
+#   so caches start the same way and peak RSS belongs to that level
+# reports per page and level: p50/p95/p99 render latency, runs/s, CPU (cores busy, forecast
+# worker processes included) and peak RSS, and the most sessions that kept p95 within --slo
+# usage: python benchmarks/load_test.py --pages Stock_analysis CAPM_Return --sessions 1 2 4 8
+#        python benchmarks/load_test.py --latency 0.2 --runs 5 -o load.json
+
+PAGES = {
+    'Stock_analysis': ROOT / 'pages' / 'Stock_analysis.py',
+    'Stock_Prediction': ROOT / 'pages' / 'Stock_Prediction.py',
+    'CAPM_Return': ROOT / 'CAPM_Return.py',
+}
+TICKERS = ('AAPL', 'MSFT', 'GOOGL', 'AMZN', 'NVDA', 'TSLA', 'META', 'JPM')
+SESSIONS = (1, 2, 4, 8)
+RUNS = 3
+HISTORY_DAYS = 10 * 252
+TIMEOUT = 600  # seconds per script run, the prediction page waits for its ARIMA job
+SLO = 2.0  # p95 seconds a level has to stay under to count as within capacity
+
+
+def fake_info(ticker, latency=0.0):
+    if latency:
+        time.sleep(latency)
+    return {'longBusinessSummary': f'{ticker} is a synthetic company.', 'sector': 'Technology',
+            'fullTimeEmployees': 1000, 'website': f'https://{ticker.lower()}.example', 'marketCap': 10 ** 12,
+            'beta': 1.1, 'trailingEps': 6.0, 'trailingPE': 30.0, 'quickRatio': 1.0, 'revenuePerShare': 25.0,
+            'profitMargins': 0.25, 'debtToEquity': 150.0, 'returnOnEquity': 1.5}
+
+
+# must run before the page modules are imported, the store directories are read at import time
+def install_backend(root, latency=0.0):
+    for name, path in (('PRICE_STORE_DIR', 'prices'), ('METADATA_CACHE_DIR', 'info'),
+                       ('BATCH_FORECAST_DIR', 'forecasts'), ('BETA_INDEX_PATH', 'beta_index.parquet')):
+        os.environ[name] = os.path.join(root, path)
+    os.environ.pop('METRICS_FILE', None)
+    os.environ.pop('METRICS_LOG', None)
+
+    import pandas as pd
+    from pages.utils import metadata_cache, price_store
+    today = pd.Timestamp.today().normalize()
+    price_store.set_fetcher('yahoo', SyntheticFetcher('yahoo', HISTORY_DAYS, end=today, ohlc=True, latency=latency))
+    price_store.set_fetcher('fred', SyntheticFetcher('fred', HISTORY_DAYS, end=today, latency=latency))
+    metadata_cache.set_fetch(lambda ticker: fake_info(ticker, latency))
+
+
+# AppTest.run() installs a mock Runtime and patches config.get_option for one run and resets
+# both when it returns, which breaks the other sessions' runs; the first run's Runtime is kept
+# for the whole process and the config patch is applied once around the level instead
+def share_runtime():
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    class Pinned(type):
+        @property
+        def _instance(cls):
+            return Runtime._instance
+
+        @_instance.setter
+        def _instance(cls, value):
+            if value is not None and Runtime._instance is None:
+                Runtime._instance = value
+
+    class SharedRuntime(Runtime, metaclass=Pinned):
+        pass
+
+    app_test.Runtime = SharedRuntime
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+
+# CPU seconds used so far by this process's live children (forecast pool workers, the progress
+# manager), from /proc; os.times() only counts children once they have been reaped
+def children_cpu():
+    tick = os.sysconf('SC_CLK_TCK')
+    total = 0.0
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            fields = stat.read_text().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == os.getpid():
+            total += (int(fields[11]) + int(fields[12])) / tick
+    return total
+
+
+def set_inputs(at, page, tickers):
+    if page == 'CAPM_Return':
+        at.multiselect[0].set_value(list(tickers[:4]))
+    else:
+        at.text_input[0].set_value(tickers[0])
+
+
+def session(page, index, runs, think, timeout, start, latencies, errors):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(str(PAGES[page]), default_timeout=timeout)
+    start.wait()
+    for run in range(runs + 1):
+        if run:
+            time.sleep(think)
+            # session i walks the ticker list from its own offset, so sessions overlap on some tickers
+            offset = (index + run) % len(TICKERS)
+            set_inputs(at, page, TICKERS[offset:] + TICKERS[:offset])
+        began = time.perf_counter()
+        try:
+            at.run()
+            failed = len(at.exception) + len(at.error)
+        except Exception as e:
+            print(f'session {index} run {run}: {type(e).__name__}: {e}', file=sys.stderr)
+            failed = 1
+        latencies.append(time.perf_counter() - began)
+        errors.append(failed)
+
+
+def run_level(page, n_sessions, runs=RUNS, think=0.0, latency=0.0, warmup=True, timeout=TIMEOUT):
+    warnings.filterwarnings('ignore')
+    import streamlit.logger
+    streamlit.logger.set_log_level('error')
+    root = tempfile.mkdtemp(prefix='load_test_')
+    install_backend(root, latency)
+    # the forecast workers start from a forkserver and import the modules afresh, so they install
+    # the same backend before their first job; by module name, this script isn't their __main__
+    from benchmarks import load_test
+    from pages.utils import forecast_jobs
+    forecast_jobs.queue.initializer, forecast_jobs.queue.initargs = load_test.install_backend, (root, latency)
+    share_runtime()
+    from streamlit.testing.v1.util import patch_config_options
+
+    with patch_config_options({'global.appTest': True}), contextlib.redirect_stdout(open(os.devnull, 'w')):
+        if warmup:
+            ready = threading.Barrier(1)
+            session(page, 0, 0, 0.0, timeout, ready, [], [])
+
+        latencies, errors = [], []
+        start = threading.Barrier(n_sessions)
+        threads = [threading.Thread(target=session, args=(page, i, runs, think, timeout, start, latencies, errors))
+                   for i in range(n_sessions)]
+        cpu, children, began = time.process_time(), children_cpu(), time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - began
+        cpu = time.process_time() - cpu + children_cpu() - children
+
+    if 'pages.utils.forecast_jobs' in sys.modules:
+        # reaps the pool workers, so their peak RSS shows up in RUSAGE_CHILDREN
+        sys.modules['pages.utils.forecast_jobs'].queue.shutdown()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {'page': page, 'sessions': n_sessions, 'runs': len(latencies), 'errors': int(sum(errors)),
+            'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(max(latencies)),
+            'wall': wall, 'throughput': len(latencies) / wall, 'cpu': cpu, 'cores': cpu / wall,
+            'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'children_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024}
+
+
+# runs in the level's own process; not a pool worker, those are daemonic and the prediction
+# page's forecast queue has to start worker processes of its own
+def _level(conn, *args):
+    conn.send(run_level(*args))
+    conn.close()
+
+
+def capacity(results, slo=SLO):
+    limits = {}
+    for r in results:
+        if r['errors'] == 0 and r['p95'] <= slo:
+            limits[r['page']] = max(limits.get(r['page'], 0), r['sessions'])
+        else:
+            limits.setdefault(r['page'], 0)
+    return limits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Concurrent-session load test of the Streamlit pages.')
+    parser.add_argument('--pages', nargs='*', default=list(PAGES), choices=list(PAGES))
+    parser.add_argument('--sessions', nargs='*', type=int, default=list(SESSIONS))
+    parser.add_argument('--runs', type=int, default=RUNS, help='ticker changes per session after the page load')
+    parser.add_argument('--think', type=float, default=0.0, help='seconds between a session\'s runs')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per backend call')
+    parser.add_argument('--cold', action='store_true', help='skip the warm-up session')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT)
+    parser.add_argument('--slo', type=float, default=SLO, help='p95 seconds for the capacity summary')
+    parser.add_argument('-o', '--output', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    results = []
+    for page in args.pages:
+        for n in args.sessions:
+            # a fresh interpreter per level: caches, imports and peak RSS start from scratch
+            context = get_context('spawn')
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=_level, args=(writer, page, n, args.runs, args.think, args.latency,
+                                                            not args.cold, args.timeout))
+            process.start()
+            writer.close()
+            r = reader.recv()
+            process.join()
+            results.append(r)
+            print(f"{page:16s} {n:3d} sessions {r['runs']:4d} runs  p50 {r['p50'] * 1000:8.0f} ms  "
+                  f"p95 {r['p95'] * 1000:8.0f} ms  p99 {r['p99'] * 1000:8.0f} ms  {r['throughput']:6.2f} runs/s  "
+                  f"cpu {r['cores']:4.2f} cores  rss {r['rss_mb']:6.0f} MiB  errors {r['errors']}", flush=True)
+
+    limits = capacity(results, args.slo)
+    print(f'\nmost sessions with p95 <= {args.slo:.1f}s and no errors (of the levels run, {os.cpu_count()} CPUs):')
+    for page, n in limits.items():
+        print(f'{page:16s} {n}')
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                     'cpus': os.cpu_count(), 'runs': args.runs, 'think': args.think,
+                     'latency': args.latency, 'warmup': not args.cold, 'slo': args.slo},
+            'results': results, 'capacity': limits,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# deterministic synthetic market data for the benchmarks, no network access needed
+# the same arguments always give the same numbers (seeds come from crc32, not hash())
+
+
+def ticker_seed(ticker, seed=0):
+    return (zlib.crc32(ticker.encode()) + seed) % 2 ** 32
+
+
+# daily returns in percent with known betas: T0..Tk plus an 'sp500' column
+def make_returns(n_days, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.03, 1.0, n_days)
+    betas = rng.uniform(0.5, 1.8, n_tickers)
+    noise = rng.normal(0, 1.5, (n_days, n_tickers))
+    returns = market[:, None] * betas + noise
+    df = pd.DataFrame(returns, columns=[f'T{i}' for i in range(n_tickers)])
+    df['sp500'] = market
+    return df
+
+
+# one long OHLCV history, Date index
+def make_ohlc(n_days=10000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('1985-01-01', periods=n_days, name='Date')
+    close = 10 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_days)))
+    spread = np.abs(rng.normal(0, 0.01, n_days)) * close
+    return pd.DataFrame({'Open': close * (1 + rng.normal(0, 0.005, n_days)), 'High': close + spread,
+                         'Low': close - spread, 'Close': close,
+                         'Volume': rng.integers(10 ** 5, 10 ** 7, n_days)}, index=index)
+
+
+# a short close series like the forecasting page downloads
+def make_prices(n_days=220, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2025-01-01', periods=n_days, name='Date')
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, n_days))), index=index, name='Close')
+
+
+# a universe on one calendar: OHLCV frames per ticker plus a FRED-style benchmark frame
+# - holiday_rate: share of benchmark days that are NaN (FRED holidays)
+# - gap_rate: share of days missing from each stock (halts, bad prints)
+# - listed: share of tickers that only start trading part way through
+def make_market(n_tickers=10, years=5, gap_rate=0.0, holiday_rate=0.01, listed=0.0, seed=0,
+                end='2026-01-02'):
+    index = pd.bdate_range(end=end, periods=int(years * 252), name='Date')
+    n_days = len(index)
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, n_days)
+    level = 4000 * np.exp(np.cumsum(market))
+    level[rng.random(n_days) < holiday_rate] = np.nan
+    benchmark = pd.DataFrame({'sp500': level}, index=index)
+
+    stocks = {}
+    for i in range(n_tickers):
+        ticker = f'T{i}'
+        r = np.random.default_rng(ticker_seed(ticker, seed))
+        beta = r.uniform(0.5, 1.8)
+        close = 50 * np.exp(np.cumsum(beta * market + r.normal(0, 0.012, n_days)))
+        spread = np.abs(r.normal(0, 0.01, n_days)) * close
+        frame = pd.DataFrame({'Open': close * (1 + r.normal(0, 0.004, n_days)), 'High': close + spread,
+                              'Low': close - spread, 'Close': close,
+                              'Volume': r.integers(10 ** 5, 10 ** 7, n_days)}, index=index)
+        keep = r.random(n_days) >= gap_rate
+        if r.random() < listed:
+            keep[:r.integers(1, n_days // 2)] = False
+        stocks[ticker] = frame[keep]
+    return stocks, benchmark
+
+
+# stands in for YahooFetcher / FredFetcher in the price store, see price_store.set_fetcher
+# - end: the history ends on this date instead of starting on `start` (load tests use today)
+# - ohlc: yahoo frames get Open / High / Low / Volume around the close, like Ticker.history
+# - latency: seconds slept per call, a stand-in for the network round trip
+class SyntheticFetcher:
+    def __init__(self, source='yahoo', n_days=220, start='2025-01-01', end=None, ohlc=False, latency=0.0):
+        self.source = source
+        self.n_days = n_days
+        self.start = start
+        self.end = end
+        self.ohlc = ohlc
+        self.latency = latency
+
+    def fetch(self, ticker, start=None, end=None):
+        if self.latency:
+            time.sleep(self.latency)
+        rng = np.random.default_rng(ticker_seed(ticker))
+        if self.end is not None:
+            index = pd.bdate_range(end=self.end, periods=self.n_days, name='Date')
+        else:
+            index = pd.bdate_range(self.start, periods=self.n_days, name='Date')
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.015, len(index))))
+        column = ticker if self.source == 'fred' else 'Close'
+        df = pd.DataFrame({column: close}, index=index)
+        if self.ohlc and self.source != 'fred':
+            spread = np.abs(rng.normal(0, 0.01, len(index))) * close
+            df['Open'] = close * (1 + rng.normal(0, 0.005, len(index)))
+            df['High'] = np.maximum(close, df['Open']) + spread
+            df['Low'] = np.minimum(close, df['Open']) - spread
+            df['Volume'] = rng.integers(10 ** 5, 10 ** 7, len(index))
+            df = df[['Open', 'High', 'Low', 'Close', 'Volume']]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
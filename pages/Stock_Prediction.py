@@ -1,8 +1,13 @@
+import time
 import streamlit as st
-from pages.utils.Model_train import get_data, get_rolling_mean, get_differencing_order, scaling, evaluate_model , stationary_check , fit_model , inverse_scaling , get_forecast
 import pandas as pd
+from pages.utils.forecast_jobs import queue
+from pages.utils.batch_forecast import load_batch_forecast
 from pages.utils.plotly_figure import plotly_table_glassmorphism ,Moving_average_forecast
+from pages.utils import instrumentation
+from pages.utils.instrumentation import plotly_chart
 
+instrumentation.start_run('stock_prediction')
 st.title("Stock Prediction")
 
 col1, col2, col3 = st.columns(3)
@@ -14,23 +19,42 @@ rmse = 0
 
 st.subheader('Predicting Next 30 days Close Price for: ' + ticker)
 
-close_price = get_data(ticker)
-rolling_price = get_rolling_mean(close_price)
-
-differencing_order = get_differencing_order(rolling_price)
-scaled_data, scaler = scaling(rolling_price)
-rmse = evaluate_model(scaled_data, differencing_order)
+# use the nightly batch result when there is one, otherwise forecast in a background worker
+# a failed job stays failed (no polling) until it expires or the user presses Retry
+batch = load_batch_forecast(ticker)
+
+if batch is not None:
+    rmse, rolling_price, forecast = batch
+else:
+    retry_key = f'retry_forecast:{ticker}'
+    job_id = queue.submit(ticker, retry=st.session_state.pop(retry_key, False))
+    status = queue.status(job_id)
+
+    if status['status'] in ('queued', 'running'):
+        st.progress(status['progress'], text=f"{status['status'].capitalize()}: {status['stage'] or 'waiting for a worker'}")
+        time.sleep(1)
+        st.rerun()
+    elif status['status'] == 'failed':
+        st.error(f"Forecast failed for {ticker}: {status['error']}")
+        if st.button('Retry'):
+            st.session_state[retry_key] = True
+            st.rerun()
+        st.stop()
+
+    result = queue.result(job_id)
+    # the model stages ran in a worker process, their spans come back with the result
+    instrumentation.record_spans(result.get('spans'), totals=False)
+    rmse = result['rmse']
+    rolling_price = result['rolling_price']
+    forecast = result['forecast'].copy()
 
 st.write("**Model RMSE Score:**", rmse)
 
-forecast = get_forecast(scaled_data, differencing_order)
-forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
-
 st.write('##### Forecast Data (Next 30 days)')
 
 fig_tail = plotly_table_glassmorphism(forecast.sort_index(ascending=True).round(3))
 fig_tail.update_layout(height=220)
-st.plotly_chart(fig_tail, use_container_width=True)
+plotly_chart(fig_tail, 'forecast_table', use_container_width=True)
 
 from datetime import timedelta
 
@@ -43,4 +67,7 @@ forecast.index = forecast.index + pd.to_timedelta(0, unit='D')
 
 forecast = pd.concat([rolling_price, forecast])
 
-st.plotly_chart(Moving_average_forecast(forecast.iloc[-150:]), use_container_width=True)
+plotly_chart(Moving_average_forecast(forecast.iloc[-150:]), 'forecast', use_container_width=True)
+
+instrumentation.debug_panel()
+instrumentation.finish_run()
@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd 
-import yfinance as yf
 import datetime as datetime
 import numpy as np 
 import plotly.graph_objects as go
 from pages.utils.plotly_figure import plotly_table_glassmorphism , filter_data , close_chart , candlestick ,RSI , Moving_average , MACD 
+from pages.utils.price_store import network_calls, slice_dates
+from pages.utils.history_cache import get_history
+from pages.utils.metadata_cache import get_info
+from pages.utils import instrumentation
+from pages.utils.instrumentation import plotly_chart, span
 
+instrumentation.start_run('stock_analysis')
 st.title("Stock Analysis")
 col1 , col2 , col3 = st.columns(3)
 
@@ -21,34 +26,41 @@ with col1:
 
 st.subheader(ticker)
 
-stock = yf. Ticker(ticker)
+calls_before = network_calls()
+# max history is fetched once per ticker and shared, every table and chart below slices it
+with span('data.history'):
+    history = get_history(ticker, st.session_state)
 
-st.write(stock.info['longBusinessSummary'] )
-st.write("**Sector:**", stock. info['sector'])
-st.write("**Full Time Employees:**" ,stock. info ['fullTimeEmployees' ])
-st.write("**Website:**", stock. info [ 'website'])
+# one cached info snapshot serves the summary and both tables
+with span('data.info'):
+    info = get_info(ticker)
+
+st.write(info['longBusinessSummary'] )
+st.write("**Sector:**", info['sector'])
+st.write("**Full Time Employees:**" ,info['fullTimeEmployees' ])
+st.write("**Website:**", info[ 'website'])
 
 col1 , col2 = st.columns(2)
 
 with col1:
     df = pd.DataFrame(index = ['Market Cap' , 'Beta' , 'EPS', 'PE Ratio'])
-    df[''] = [stock.info["marketCap"] , stock.info["beta"] , stock.info["trailingEps"] , stock.info["trailingPE"]]
+    df[''] = [info["marketCap"] , info["beta"] , info["trailingEps"] , info["trailingPE"]]
     fig_df = plotly_table_glassmorphism(df)
-    st.plotly_chart(fig_df , use_container_width= True)
+    plotly_chart(fig_df, 'key_stats', use_container_width=True)
 with col2:
     # Financial metrics
     metrics = {
-        'Quick Ratio': stock.info.get('quickRatio', 'N/A'),
-        'Revenue per Share': stock.info.get('revenuePerShare', 'N/A'),
-        'Profit Margins': stock.info.get('profitMargins', 'N/A'),
-        'Debt to Equity': stock.info.get('debtToEquity', 'N/A'),
-        'Return on Equity': stock.info.get('returnOnEquity', 'N/A')
+        'Quick Ratio': info.get('quickRatio', 'N/A'),
+        'Revenue per Share': info.get('revenuePerShare', 'N/A'),
+        'Profit Margins': info.get('profitMargins', 'N/A'),
+        'Debt to Equity': info.get('debtToEquity', 'N/A'),
+        'Return on Equity': info.get('returnOnEquity', 'N/A')
     }
     
     df = pd.DataFrame(list(metrics.items()), columns=['Metric', 'Value'])
     
     fig_df = plotly_table_glassmorphism(df)
-    st.plotly_chart(fig_df, width='stretch')
+    plotly_chart(fig_df, 'metrics', width='stretch')
 
 # data = yf.download(ticker , start = start_date , end = end_date )
 
@@ -57,14 +69,14 @@ with col2:
 # col1.metric("Daily Change" , str(round(data['Close'].iloc[-1],2)) , str(round(daily_change , 2)))
 
 
-ticker = "AAPL" 
 start_date = st.date_input("Start Date", pd.to_datetime("today")) 
 end_date = st.date_input("End Date", pd.to_datetime("today"))
 
-data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+ohlcv = [c for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in history.columns]
+data = slice_dates(history, start_date, end_date)[ohlcv]
 
 if len(data) < 2:
-    data = yf.download(ticker, period="5d", progress=False)
+    data = history[ohlcv].tail(5)
 
 
 col1, col2, col3 = st.columns(3)
@@ -90,7 +102,7 @@ last_Ten_df = data.tail(10).sort_index(ascending = False).round(3)
 fig_df = plotly_table_glassmorphism(last_Ten_df)
 
 st.write('##### Historical Data (Last 10 days)')
-st.plotly_chart (fig_df , use_container_width = True )
+plotly_chart(fig_df, 'history_table', use_container_width=True)
 
 col1, col2, col3, col4, col5, col6, col7, col8, col9, col10, col11, col12 = st.columns([1,1,1,1,1,1,1,1,1,1,1,1])
 
@@ -131,13 +143,7 @@ with col2:
     else:
         indicators = st.selectbox("", ('RSI', 'Moving Average', 'MACD'))
 
-ticker_ = yf.Ticker(ticker)
-new_df1 = ticker_.history(period='max')
-data1 = ticker_.history(period='max')
-
-# Fetch historical data once
-ticker_ = yf.Ticker(ticker)
-df = ticker_.history(period='max')
+df = history
 
 # Set default period if empty
 if num_period == '':
@@ -146,29 +152,34 @@ if num_period == '':
 # Display charts based on chart type and indicator selection
 if chart_type == 'Candle':
     # Using YOUR candlestick function here ✓
-    st.plotly_chart(candlestick(df, num_period), use_container_width=True)
+    plotly_chart(candlestick(df, num_period, ticker=ticker), 'candlestick', use_container_width=True)
     
     # Display indicator
     if indicators == 'RSI':
         # Using YOUR RSI function here ✓
-        st.plotly_chart(RSI(df, num_period), use_container_width=True)
+        plotly_chart(RSI(df, num_period, ticker), 'RSI', use_container_width=True)
     elif indicators == 'MACD':
         # Using YOUR MACD function here ✓
-        st.plotly_chart(MACD(df, num_period), use_container_width=True)
+        plotly_chart(MACD(df, num_period, ticker), 'MACD', use_container_width=True)
 
 elif chart_type == 'Line':
     # Display appropriate line chart based on indicator
     if indicators == 'Moving Average':
         # Using YOUR Moving_average function here ✓
-        st.plotly_chart(Moving_average(df, num_period), use_container_width=True)
+        plotly_chart(Moving_average(df, num_period, ticker), 'Moving_average', use_container_width=True)
     else:
         # Using YOUR close_chart function here ✓
-        st.plotly_chart(close_chart(df, num_period), use_container_width=True)
+        plotly_chart(close_chart(df, num_period, ticker=ticker), 'close_chart', use_container_width=True)
         
         # Display indicator
         if indicators == 'RSI':
             # Using YOUR RSI function here ✓
-            st.plotly_chart(RSI(df, num_period), use_container_width=True)
+            plotly_chart(RSI(df, num_period, ticker), 'RSI', use_container_width=True)
         elif indicators == 'MACD':
             # Using YOUR MACD function here ✓
-            st.plotly_chart(MACD(df, num_period), use_container_width=True)
\ No newline at end of file
+            plotly_chart(MACD(df, num_period, ticker), 'MACD', use_container_width=True)
+
+st.caption(f"Network calls this render: {network_calls() - calls_before}")
+
+instrumentation.debug_panel()
+instrumentation.finish_run()
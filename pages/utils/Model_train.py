@@ -1,17 +1,21 @@
-import yfinance as yf
-from statsmodels.tsa.stattools import adfuller
-from sklearn.metrics import mean_squared_error, r2_score
-from statsmodels.tsa.arima.model import ARIMA
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 import pandas as pd
+from pages.utils.instrumentation import timed
+from pages.utils.price_store import get_prices
+from pages.utils.forecasting import FORECAST_STEPS, service
+from pages.utils.stationarity import differencing_order
 
-def get_data(ticker):
-    stock_data = yf.download(ticker, start='2025-01-01')
+HOLDOUT = FORECAST_STEPS  # last bars scored by evaluate_model
+
+def get_data(ticker, start='2025-01-01'):
+    stock_data = get_prices(ticker, start=start)
     return stock_data['Close']
 
+# statsmodels / sklearn are imported where they are used, they add ~2s to a cold import
+@timed('model.adfuller')
 def stationary_check(close_price):
+    from statsmodels.tsa.stattools import adfuller
     adf_test = adfuller(close_price)
     p_value = round(adf_test[1], 3)
     return p_value
@@ -20,40 +24,41 @@ def get_rolling_mean(close_price):
     rolling_price = close_price.rolling(window=7).mean().dropna()
     return rolling_price
 
+# d is capped at 2 and cached per series, see pages/utils/stationarity.py
 def get_differencing_order(close_price):
-    p_value = stationary_check(close_price)
-    d = 0
-    while True:
-        if p_value > 0.05:
-            d += 1
-            close_price = close_price.diff().dropna()
-            p_value = stationary_check(close_price)
-        else:
-            break
-    return d
+    return differencing_order(close_price)
+
+# order is searched by AIC when not given, fitted models are reused across reruns
+def get_order(data, differencing_order, ticker=None):
+    return service.order(data, differencing_order, ticker)
+
+# order for evaluate_model and get_forecast: searched without the holdout, so the scored bars stay unseen
+def get_train_order(data, differencing_order, ticker=None):
+    return get_order(data[:-HOLDOUT], differencing_order, ticker)
 
-def fit_model(data, differencing_order):
-    model = ARIMA(data, order=(30, differencing_order, 30))
-    model_fit = model.fit()
-    
-    forecast_steps = 30
-    forecast = model_fit.get_forecast(steps=forecast_steps)
-    predictions = forecast.predicted_mean
+def fit_model(data, differencing_order, order=None, ticker=None):
+    if order is None:
+        order = get_order(data, differencing_order, ticker)
+    predictions = service.forecast(data, order, ticker, steps=30)
     return predictions
 
-def evaluate_model(original_price, differencing_order):
-    train_data, test_data = original_price[:-30], original_price[-30:]
-    predictions = fit_model(train_data, differencing_order)
+@timed('model.evaluate')
+def evaluate_model(original_price, differencing_order, order=None, ticker=None):
+    from sklearn.metrics import mean_squared_error
+    train_data, test_data = original_price[:-HOLDOUT], original_price[-HOLDOUT:]
+    predictions = fit_model(train_data, differencing_order, order, ticker)
     rmse = np.sqrt(mean_squared_error(test_data, predictions))
     return round(rmse, 2)
 
 def scaling(close_price):
+    from sklearn.preprocessing import StandardScaler
     scaler = StandardScaler()
     scaled_data = scaler.fit_transform(np.array(close_price).reshape(-1, 1))
     return scaled_data, scaler
 
-def get_forecast(original_price, differencing_order):
-    predictions = fit_model(original_price, differencing_order)
+@timed('model.forecast')
+def get_forecast(original_price, differencing_order, order=None, ticker=None):
+    predictions = fit_model(original_price, differencing_order, order, ticker)
     start_date = datetime.now().strftime('%Y-%m-%d')
     end_date = (datetime.now() + timedelta(days=29)).strftime('%Y-%m-%d')
     forecast_index = pd.date_range(start=start_date, end=end_date, freq='D')
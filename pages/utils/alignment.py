@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from pages.utils.instrumentation import timed
+
+# joins any number of price series onto the benchmark's trading days
+# - dates are normalized once per series (tz dropped keeping wall-clock date, time set to midnight)
+# - the calendar is the set of benchmark dates with a value, so FRED holidays / NaN rows never
+#   reach the regressions
+# - every series is scattered into one (dates x columns) array by integer position, no merges
+#   prices can be a DataFrame, a dict of Series / OHLC frames, or a list of named Series
+# missing-data policies for gaps left inside a series:
+#   'drop'   leave gaps, rows with any gap are dropped
+#   'ffill'  carry the last price forward
+#   'limit'  carry forward across gaps of at most `limit` days; a longer gap is left empty
+#            end to end and treated like 'drop', never half filled with stale prices
+# the calendar is sorted first, series dates are matched to it with one searchsorted each
+
+POLICIES = ('drop', 'ffill', 'limit')
+FILL_LIMIT = 3
+
+
+def trading_days(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+# calendar day of every timestamp as datetime64[D], cheaper than normalize() which re-infers freq
+def _days(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy().astype('datetime64[D]')
+
+
+def _positions(days, calendar_days):
+    if len(calendar_days) == 0:
+        return np.full(len(days), -1)
+    pos = np.searchsorted(calendar_days, days)
+    pos[pos == len(calendar_days)] = 0
+    return np.where(calendar_days[pos] == days, pos, -1)
+
+
+def _as_series(data, name=None):
+    if isinstance(data, pd.DataFrame):
+        data = data['Close'] if 'Close' in data.columns else data.iloc[:, 0]
+    return data.rename(name) if name is not None else data
+
+
+# ffill restricted to runs of at most `limit` missing rows, per column
+def _fill_short_gaps(frame, limit):
+    missing = frame.isna().to_numpy()
+    rows = np.arange(len(frame))[:, None]
+    # last valid row at or before / first valid row at or after every cell
+    prev = np.maximum.accumulate(np.where(missing, -1, rows), axis=0)
+    after = np.minimum.accumulate(np.where(missing, len(frame), rows)[::-1], axis=0)[::-1]
+    return frame.ffill().mask(missing & (after - prev - 1 > limit))
+
+
+@timed('data.align')
+def align_prices(prices, benchmark, policy='ffill', limit=FILL_LIMIT, benchmark_name='sp500', dropna=True):
+    if policy not in POLICIES:
+        raise ValueError(f'unknown policy {policy!r}, expected one of {POLICIES}')
+    bench = _as_series(benchmark, benchmark_name)
+    bench_values = bench.to_numpy(dtype=float)
+    has_value = ~np.isnan(bench_values)
+    calendar = trading_days(bench.index)[has_value]
+    order = np.argsort(calendar, kind='stable')
+    calendar, bench_values = calendar[order], bench_values[has_value][order]
+    # keep the last bar if a date appears twice (e.g. an intraday bar and the close)
+    unique = ~calendar.duplicated(keep='last')
+    calendar = calendar[unique].rename('Date')
+    bench_values = bench_values[unique]
+
+    calendar_days = calendar.to_numpy().astype('datetime64[D]')
+    # columns of one frame share an index, so each distinct index is matched once and its
+    # columns are scattered as one block
+    if isinstance(prices, pd.DataFrame):
+        blocks = [(prices.index, list(prices.columns), prices.to_numpy(dtype=float))]
+    else:
+        if not isinstance(prices, dict):
+            prices = {s.name: s for s in prices}
+        groups = {}
+        for name, data in prices.items():
+            series = _as_series(data)
+            groups.setdefault(id(series.index), (series.index, [], []))
+            groups[id(series.index)][1].append(name)
+            groups[id(series.index)][2].append(series.to_numpy(dtype=float))
+        blocks = [(index, names, np.column_stack(cols)) for index, names, cols in groups.values()]
+
+    names = [name for _, block_names, _ in blocks for name in block_names]
+    values = np.full((len(calendar), len(names)), np.nan)
+    off_calendar = np.zeros(len(names), dtype=int)
+    j = 0
+    for index, block_names, block in blocks:
+        pos = _positions(_days(index), calendar_days)
+        found = pos >= 0
+        k = len(block_names)
+        values[pos[found], j:j + k] = block[found]
+        off_calendar[j:j + k] = (~found).sum()
+        j += k
+
+    frame = pd.DataFrame(values, index=calendar, columns=names)
+    missing = frame.isna().sum().to_numpy()
+    if policy == 'ffill':
+        frame = frame.ffill()
+    elif policy == 'limit':
+        frame = _fill_short_gaps(frame, limit)
+    filled = missing - frame.isna().sum().to_numpy()
+    frame[benchmark_name] = bench_values
+
+    rows = len(frame)
+    if dropna:
+        frame = frame.dropna()
+
+    stats = {
+        'policy': policy,
+        'calendar_days': len(calendar),
+        'benchmark_gaps': int((~has_value).sum() + (~unique).sum()),
+        'rows': len(frame),
+        'dropped_rows': rows - len(frame),
+        'columns': pd.DataFrame({'missing': missing, 'filled': filled, 'off_calendar': off_calendar,
+                                 'coverage': 1 - missing / max(len(calendar), 1)}, index=pd.Index(names, name='ticker')),
+    }
+    return frame, stats
@@ -0,0 +1,125 @@
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.forecasting import FORECAST_STEPS, _fit, search_order
+from pages.utils.instrumentation import collect_spans, record_spans, timed
+from pages.utils.stationarity import find_differencing_order
+
+# walk-forward backtest of the ARIMA forecasts
+# - the forecast origin rolls through history every `step` bars, each origin forecasts the next
+#   `horizon` bars from the data up to the origin only
+# - d and the (p, q) order come from the first training window, so nothing looks ahead
+# - between origins the fitted model is carried forward with results.extend(new bars), a Kalman
+#   filter update with the same parameters; every `refit_every` origins it is re-estimated,
+#   warm-started from the previous parameters
+# - origins are split into contiguous blocks, one block per worker process
+# works on the 7-day rolling mean in price units, like the prediction page but without the
+# StandardScaler (fitted on the full series it would leak the future, and MAPE needs prices)
+# usage: python -m pages.utils.backtest --ticker AAPL --years 5 --step 5 --workers 4
+
+MIN_TRAIN = 250
+STEP = 5  # bars between origins, weekly
+REFIT_EVERY = 13  # origins between full re-estimations, about a quarter with weekly origins
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def origins(n, horizon=FORECAST_STEPS, step=STEP, min_train=MIN_TRAIN):
+    return list(range(min_train, n - horizon + 1, step))
+
+
+def _errors(actual, predicted):
+    err = predicted - actual
+    return np.sqrt(np.mean(err ** 2)), np.mean(np.abs(err / actual)) * 100
+
+
+# runs in a worker process: one contiguous block of origins, returns (rows, spans of the fits)
+def _run_block(args):
+    values, block, order, horizon, refit_every = args
+    rows = []
+    with collect_spans() as spans, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model_fit = None
+        last = 0
+        for i, origin in enumerate(block):
+            began = time.perf_counter()
+            refit = model_fit is None or i % refit_every == 0
+            if refit:
+                start_params = None if model_fit is None else model_fit.params
+                model_fit = _fit(values[:origin], order, start_params)
+            else:
+                model_fit = model_fit.extend(values[last:origin])
+            last = origin
+            predicted = np.asarray(model_fit.forecast(horizon))
+            rmse, mape = _errors(values[origin:origin + horizon], predicted)
+            rows.append((origin, rmse, mape, refit, time.perf_counter() - began))
+    return rows, spans
+
+
+@timed('model.backtest')
+def walk_forward(series, horizon=FORECAST_STEPS, step=STEP, min_train=MIN_TRAIN, order=None,
+                 refit_every=REFIT_EVERY, max_workers=MAX_WORKERS):
+    series = pd.Series(series).dropna()
+    values = series.to_numpy(dtype=float)
+    points = origins(len(values), horizon, step, min_train)
+    if not points:
+        raise ValueError(f'need at least {min_train + horizon} bars, got {len(values)}')
+    if order is None:
+        d = find_differencing_order(values[:min_train])[0]
+        order = search_order(values[:min_train], d, max_workers=max_workers)
+
+    n_blocks = min(max_workers, len(points))
+    blocks = [list(b) for b in np.array_split(points, n_blocks)]
+    jobs = [(values, block, order, horizon, refit_every) for block in blocks]
+    if n_blocks > 1:
+        with ProcessPoolExecutor(max_workers=n_blocks) as pool:
+            results = list(pool.map(_run_block, jobs))
+    else:
+        results = [_run_block(job) for job in jobs]
+    for _, spans in results:
+        record_spans(spans, totals=n_blocks > 1)
+
+    frame = pd.DataFrame([row for rows, _ in results for row in rows],
+                         columns=['origin', 'rmse', 'mape', 'refit', 'seconds'])
+    frame.index = series.index[frame['origin']]
+    frame.attrs['order'] = order
+    return frame
+
+
+def summary(frame):
+    stats = frame[['rmse', 'mape']].describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95]).T
+    return stats.drop(columns='count')
+
+
+def main(argv=None):
+    from pages.utils import Model_train
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the 30-day ARIMA forecast.')
+    parser.add_argument('--ticker', required=True)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--step', type=int, default=STEP)
+    parser.add_argument('--horizon', type=int, default=FORECAST_STEPS)
+    parser.add_argument('--refit-every', type=int, default=REFIT_EVERY)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('-o', '--output', help='per-origin results as CSV')
+    args = parser.parse_args(argv)
+
+    start = (pd.Timestamp.today() - pd.DateOffset(years=args.years)).date()
+    rolling_price = Model_train.get_rolling_mean(Model_train.get_data(args.ticker, start))
+    began = time.perf_counter()
+    frame = walk_forward(rolling_price, args.horizon, args.step, order=None,
+                         refit_every=args.refit_every, max_workers=args.workers)
+    elapsed = time.perf_counter() - began
+    print(summary(frame).round(3).to_string())
+    print(f'{len(frame)} origins, ARIMA{frame.attrs["order"]}, {int(frame["refit"].sum())} refits, '
+          f'{elapsed:.1f}s with {args.workers} workers')
+    if args.output:
+        frame.to_csv(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from pages.utils.forecast_jobs import DEFAULT_CONFIG, job_key, run_forecast_job
+from pages.utils.instrumentation import record_spans
+
+# batch forecasting: the Model_train pipeline over many tickers in a process pool
+# results are written to disk as two tables the prediction page can read:
+#   scores.parquet    one row per ticker (rmse, order, status, seconds)
+#   forecasts.parquet ticker, Date, Close, kind ('history' or 'forecast')
+# usage: python -m pages.utils.batch_forecast --tickers AAPL MSFT NVDA --workers 4
+
+OUT_DIR = os.environ.get('BATCH_FORECAST_DIR', os.path.join('.price_store', 'forecasts'))
+MAX_WORKERS = os.cpu_count() or 1
+HISTORY_ROWS = 150
+
+
+def _forecast_one(ticker, config):
+    start = time.perf_counter()
+    try:
+        result = run_forecast_job(job_key(ticker, config), ticker, config)
+        error = None
+    except Exception as e:
+        result, error = None, f'{type(e).__name__}: {e}'
+    return ticker, result, error, time.perf_counter() - start
+
+
+def run_batch(tickers, config=None, max_workers=MAX_WORKERS):
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    scores = []
+    frames = []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_forecast_one, ticker, config) for ticker in tickers]
+        for future in as_completed(futures):
+            ticker, result, error, seconds = future.result()
+            scores.append({'ticker': ticker, 'rmse': None if result is None else result['rmse'],
+                           'order': None if result is None else str(result['order']),
+                           'status': 'failed' if error else 'done', 'error': error, 'seconds': seconds})
+            if result is not None:
+                record_spans(result.get('spans'))
+                history = result['rolling_price'].iloc[-HISTORY_ROWS:]
+                frames.append(pd.DataFrame({'ticker': ticker, 'Date': history.index,
+                                            'Close': history.to_numpy(), 'kind': 'history'}))
+                forecast = result['forecast']
+                frames.append(pd.DataFrame({'ticker': ticker, 'Date': forecast.index,
+                                            'Close': forecast['Close'].to_numpy(), 'kind': 'forecast'}))
+    elapsed = time.perf_counter() - start
+
+    scores = pd.DataFrame(scores, columns=['ticker', 'rmse', 'order', 'status', 'error', 'seconds'])
+    scores = scores.sort_values('ticker').reset_index(drop=True)
+    forecasts = pd.concat(frames, ignore_index=True) if frames else \
+        pd.DataFrame(columns=['ticker', 'Date', 'Close', 'kind'])
+    return scores, forecasts, elapsed
+
+
+def write_batch(scores, forecasts, out_dir=OUT_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    scores.assign(created=datetime.now()).to_parquet(os.path.join(out_dir, 'scores.parquet'))
+    forecasts.to_parquet(os.path.join(out_dir, 'forecasts.parquet'))
+
+
+# returns (rmse, history series, forecast frame) for one ticker, or None if the batch has no result
+def load_batch_forecast(ticker, out_dir=OUT_DIR, max_age=24 * 60 * 60):
+    scores_path = os.path.join(out_dir, 'scores.parquet')
+    if not os.path.exists(scores_path) or time.time() - os.path.getmtime(scores_path) > max_age:
+        return None
+    scores = pd.read_parquet(scores_path)
+    row = scores[(scores['ticker'] == ticker.upper()) & (scores['status'] == 'done')]
+    if row.empty:
+        return None
+    forecasts = pd.read_parquet(os.path.join(out_dir, 'forecasts.parquet'),
+                                filters=[('ticker', '==', ticker.upper())])
+    history = forecasts[forecasts['kind'] == 'history'].set_index('Date')['Close']
+    forecast = forecasts[forecasts['kind'] == 'forecast'].set_index('Date')[['Close']]
+    return row['rmse'].iloc[0], history, forecast
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Forecast the next 30 days for a list of tickers.')
+    parser.add_argument('--tickers', nargs='*', default=[])
+    parser.add_argument('--tickers-file', help='text file with one ticker per line')
+    parser.add_argument('--start', default=DEFAULT_CONFIG['start'])
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--out', default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += f.read().split()
+    if not tickers:
+        parser.error('no tickers given')
+
+    scores, forecasts, elapsed = run_batch(tickers, {'start': args.start}, args.workers)
+    write_batch(scores, forecasts, args.out)
+    done = int((scores['status'] == 'done').sum())
+    print(scores.to_string(index=False))
+    print(f'{done}/{len(scores)} tickers in {elapsed:.1f}s with {args.workers} workers '
+          f'({len(scores) / elapsed * 60:.1f} tickers/min), written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# server-side downsampling so long histories don't ship every bar to the browser
+# - lines: Largest-Triangle-Three-Buckets (LTTB), about one point per horizontal pixel
+# - candles: OHLC bars aggregated to weekly or monthly bars, a few pixels per candle
+
+CHART_WIDTH = 1200  # px, the width st.plotly_chart gets in the wide layout
+POINTS_PER_PIXEL = 1
+PIXELS_PER_CANDLE = 4
+
+
+def max_points(width=CHART_WIDTH):
+    return int(width * POINTS_PER_PIXEL)
+
+
+def max_candles(width=CHART_WIDTH):
+    return int(width // PIXELS_PER_CANDLE)
+
+
+def _as_float(x):
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return pd.DatetimeIndex(x).as_unit('ns').asi8.astype(float)
+    return np.asarray(x, dtype=float)
+
+
+def _take(values, idx):
+    if isinstance(values, pd.Series):
+        return values.iloc[idx]
+    if isinstance(values, pd.Index):
+        return values[idx]
+    return np.asarray(values)[idx]
+
+
+# indices of the points LTTB keeps out of (x, y); NaN points are dropped first
+def lttb_indices(x, y, n_out):
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+    xs = _as_float(x)[valid]
+    ys = y[valid]
+
+    # bucket edges for the n - 2 interior points, first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    bounds = np.append(edges, n)
+    # average of each "next" bucket, the last interior bucket looks at the final point
+    avg_x = (np.add.reduceat(xs, bounds[1:-1]) / np.diff(bounds[1:])).tolist()
+    avg_y = (np.add.reduceat(ys, bounds[1:-1]) / np.diff(bounds[1:])).tolist()
+
+    # buckets only hold a handful of points, plain Python beats per-bucket numpy calls here
+    xl, yl = xs.tolist(), ys.tolist()
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        xa, ya, ax, ay = xl[a], yl[a], avg_x[i], avg_y[i]
+        best, best_area = edges[i], -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs((xa - ax) * (yl[j] - ya) - (xa - xl[j]) * (ay - ya))
+            if area > best_area:
+                best, best_area = j, area
+        a = best
+        keep.append(a)
+    keep.append(n - 1)
+    return valid[np.array(keep)]
+
+
+def lttb(x, y, n_out):
+    idx = lttb_indices(x, y, n_out)
+    return _take(x, idx), _take(y, idx)
+
+
+# aggregate a Date-indexed frame with OHLC(V) columns to the finest of
+# weekly / monthly / quarterly bars that fits in n_out candles
+def resample_ohlc(dataframe, n_out):
+    if len(dataframe) <= n_out:
+        return dataframe
+    agg = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+    if 'Volume' in dataframe.columns:
+        agg['Volume'] = 'sum'
+    days = (dataframe.index[-1] - dataframe.index[0]).days
+    rule = 'W-FRI' if days / 7 <= n_out else 'ME' if days / 30 <= n_out else 'QE'
+    return dataframe.resample(rule).agg(agg).dropna(subset=['Close'])
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pages.utils.instrumentation import attach_run, run_context, span
+from pages.utils.price_store import get_prices
+
+# concurrent bulk fetch of (source, ticker) pairs through the price store
+# with retry with backoff and partial-failure reporting; the store rate limits the downloads
+
+MAX_WORKERS = 8
+
+
+class FetchResult:
+    def __init__(self):
+        self.data = {}
+        self.errors = {}
+        self.task_time = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    # sum of the individual fetch times is what the old serial loop would have taken
+    @property
+    def speedup(self):
+        return self.task_time / self.elapsed if self.elapsed else 1.0
+
+    def get(self, ticker, source='yahoo'):
+        return self.data.get((source, ticker))
+
+
+def fetch_with_retry(fn, retries=3, backoff=0.5):
+    for attempt in range(retries + 1):
+        try:
+            df = fn()
+            if df is None or len(df) == 0:
+                raise ValueError('no data returned')
+            return df
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_many(items, start=None, end=None, fetch=get_prices, max_workers=MAX_WORKERS,
+               retries=2, backoff=0.5):
+    items = list(dict.fromkeys(items))
+    result = FetchResult()
+    lock = threading.Lock()
+    # pool threads record their download spans into the caller's page run
+    context = run_context()
+
+    def task(item):
+        source, ticker = item
+        began = time.perf_counter()
+        try:
+            with attach_run(context):
+                df = fetch_with_retry(lambda: fetch(ticker, source=source, start=start, end=end),
+                                      retries=retries, backoff=backoff)
+            error = None
+        except Exception as e:
+            df, error = None, f'{type(e).__name__}: {e}'
+        took = time.perf_counter() - began
+        with lock:
+            result.task_time += took
+            if error is None:
+                result.data[item] = df
+            else:
+                result.errors[item] = error
+
+    began = time.perf_counter()
+    if items:
+        with span('data.fetch_many'), ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            list(pool.map(task, items))
+    result.elapsed = time.perf_counter() - began
+    return result
@@ -0,0 +1,119 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from pages.utils.instrumentation import record_size, register_cache
+
+# process-wide LRU of built chart figures, keyed by (function, ticker, last bar, last close,
+# bars, period, other arguments); a rerun caused by an unrelated widget gets the same figure object back
+# - bounded by entry count and by payload size, estimated from the trace arrays on insert
+#   (within ~20% of len(fig.to_json()) for the chart builders, without serializing twice)
+# - cached figures are shared between sessions: callers must not mutate them
+#   (st.plotly_chart copies the figure before serializing, so handing it to Streamlit is fine)
+# - calls without a ticker are not cached, the key could not tell two frames apart
+# Streamlit re-validates a figure passed as dict / JSON (slower than building it), so the
+# Figure object is what gets cached rather than its JSON text
+
+MAX_ENTRIES = 256
+MAX_BYTES = 128 * 2 ** 20
+ARRAYS = ('x', 'y', 'open', 'high', 'low', 'close')
+
+
+# JSON payload estimate: numeric arrays go out base64-encoded (4/3 of their bytes), dates as
+# ISO strings, plus a fixed allowance for layout and trace attributes
+def estimate_size(fig):
+    size = 2048
+    for trace in fig.data:
+        size += 256
+        for name in ARRAYS:
+            values = getattr(trace, name, None)
+            if values is None:
+                continue
+            values = np.asarray(values)
+            if values.dtype.kind == 'M':
+                size += 24 * values.size
+            elif values.dtype.kind in 'biuf':
+                size += values.nbytes * 4 // 3
+            else:
+                size += sum(len(str(v)) + 3 for v in values.ravel())
+    return size
+
+
+class FigureCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, build, name=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        fig = build()
+        size = estimate_size(fig)
+        if name:
+            record_size(f'figure.{name}', size)
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = (fig, size)
+                self.bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return fig
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries),
+                'bytes': self.bytes, 'evictions': self.evictions}
+
+
+_cache = FigureCache()
+register_cache('figures', _cache.stats)
+
+
+def figure_key(name, dataframe, arguments):
+    last = dataframe.index[-1] if len(dataframe) else None
+    # the last close too, an intraday refresh replaces the last bar without adding one
+    close = dataframe['Close'].iloc[-1] if len(dataframe) and 'Close' in dataframe.columns else None
+    return (name, arguments.get('ticker'), last, close, len(dataframe),
+            tuple((k, v) for k, v in arguments.items() if k not in ('dataframe', 'ticker')))
+
+
+# decorator for chart builders whose first argument is the history frame
+def cached_figure(name):
+    def decorator(build):
+        signature = inspect.signature(build)
+
+        @functools.wraps(build)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            if arguments.get('ticker') is None:
+                return build(*args, **kwargs)
+            key = figure_key(name, arguments['dataframe'], arguments)
+            return _cache.get(key, lambda: build(*args, **kwargs), name)
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    return _cache.stats()
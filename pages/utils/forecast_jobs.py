@@ -0,0 +1,205 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from pages.utils.instrumentation import collect_spans, record_spans
+
+# background forecast jobs on a local process pool
+# identical (ticker, config) requests from different sessions share one job,
+# the page submits, then polls status() until the result is ready
+# finished jobs, failed ones included, are served until RESULT_TTL expires; a failed job is only
+# run again before that when submit() is called with retry=True (the page's Retry button)
+# workers start from a forkserver, not forked from the multi-threaded Streamlit server where another
+# session's thread may hold a lock; a job with no result after JOB_TIMEOUT is reported as failed
+# runner and initializer must be importable by name, the workers don't load the page script
+
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+RESULT_TTL = 30 * 60  # seconds a finished or failed job is served before it is recomputed
+JOB_TIMEOUT = 15 * 60  # seconds from submit before an unfinished job counts as failed
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+DEFAULT_CONFIG = {'start': '2025-01-01'}
+
+STAGES = ['download', 'stationarity', 'scaling', 'order search', 'evaluate', 'forecast', 'done']
+
+
+def job_key(ticker, config):
+    payload = json.dumps([ticker.upper(), config], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+# runs in a worker process
+def run_forecast_job(job_id, ticker, config, progress=None):
+    from pages.utils.forecasting import service
+
+    def stage(i):
+        if progress is not None:
+            progress[job_id] = (i / (len(STAGES) - 1), STAGES[i])
+
+    # the job already owns a worker process, so the order search runs in-process
+    service.max_workers = 1
+
+    # the stage spans are recorded in this process, they go back to the page with the result
+    with collect_spans() as spans:
+        result = _run_stages(ticker, config, stage)
+    result['spans'] = spans
+    return result
+
+
+def _run_stages(ticker, config, stage):
+    from pages.utils import Model_train
+
+    stage(0)
+    close_price = Model_train.get_data(ticker, config['start'])
+    rolling_price = Model_train.get_rolling_mean(close_price)
+    stage(1)
+    differencing_order = Model_train.get_differencing_order(rolling_price)
+    stage(2)
+    scaled_data, scaler = Model_train.scaling(rolling_price)
+    stage(3)
+    order = Model_train.get_train_order(scaled_data, differencing_order, ticker)
+    stage(4)
+    rmse = Model_train.evaluate_model(scaled_data, differencing_order, order, ticker)
+    stage(5)
+    forecast = Model_train.get_forecast(scaled_data, differencing_order, order, ticker)
+    forecast['Close'] = Model_train.inverse_scaling(scaler, forecast['Close'])
+    stage(6)
+    return {'rmse': rmse, 'order': order, 'forecast': forecast, 'rolling_price': rolling_price}
+
+
+# a new process re-runs the __main__ file, and Streamlit points __main__ at the running page
+# script; workers and the progress manager are started with an empty __main__ instead
+@contextmanager
+def _no_main():
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+# initializer(*initargs) runs once in every worker process, e.g. to install a price fetcher
+class ForecastJobQueue:
+    def __init__(self, max_workers=MAX_WORKERS, result_ttl=RESULT_TTL, runner=run_forecast_job,
+                 job_timeout=JOB_TIMEOUT, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.runner = runner
+        self.job_timeout = job_timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.pool = None
+        self.manager = None
+        self.progress = None
+        self.submitted = 0
+        self.deduped = 0
+
+    def _start(self):
+        context = multiprocessing.get_context(START_METHOD)
+        if self.manager is None:
+            self.manager = context.Manager()
+            self.progress = self.manager.dict()
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                            initializer=self.initializer, initargs=self.initargs)
+
+    # an overdue job fails with a TimeoutError; if it is already running its worker may be stuck,
+    # so later jobs go to a fresh pool and the old one exits once its running jobs do
+    def _expire(self, job):
+        job['error'] = TimeoutError(f'no result after {self.job_timeout:.0f}s')
+        job['finished'] = time.time()
+        if not job['future'].cancel() and job['pool'] is self.pool:
+            self.pool = None
+            job['pool'].shutdown(wait=False)
+
+    def _prune(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job['finished'] and now - job['finished'] > self.result_ttl]
+        for job_id in expired:
+            del self.jobs[job_id]
+            if self.progress is not None:
+                self.progress.pop(job_id, None)
+
+    # runs once per job: the worker's spans go into this process's totals (not into a page run,
+    # the page adds them to its own run when it shows the result)
+    def _finished(self, job, future):
+        if job['error'] is not None:
+            return
+        job['finished'] = time.time()
+        if not future.cancelled() and future.exception() is None:
+            result = future.result()
+            if isinstance(result, dict):
+                record_spans(result.get('spans'), run=False)
+
+    def submit(self, ticker, config=None, retry=False):
+        config = dict(DEFAULT_CONFIG, **(config or {}))
+        job_id = job_key(ticker, config)
+        with self.lock:
+            self.submitted += 1
+            self._prune()
+            job = self.jobs.get(job_id)
+            if job is not None:
+                failed = self.status(job_id)['status'] == 'failed'
+                if not (retry and failed):
+                    self.deduped += 1
+                    return job_id
+            with _no_main():
+                self._start()
+                self.progress.pop(job_id, None)  # a retried job starts from the first stage again
+                future = self.pool.submit(self.runner, job_id, ticker, config, self.progress)
+            job = {'ticker': ticker, 'config': config, 'future': future, 'pool': self.pool,
+                   'submitted': time.time(), 'finished': None, 'error': None}
+            future.add_done_callback(lambda f, job=job: self._finished(job, f))
+            self.jobs[job_id] = job
+        return job_id
+
+    def status(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {'status': 'unknown', 'progress': 0.0, 'stage': None, 'error': None}
+        future = job['future']
+        fraction, stage = self.progress.get(job_id, (0.0, None))
+        if job['error'] is None and not future.done():
+            if time.time() - job['submitted'] <= self.job_timeout:
+                status = 'running' if future.running() or stage else 'queued'
+                return {'status': status, 'progress': fraction, 'stage': stage, 'error': None,
+                        'elapsed': time.time() - job['submitted']}
+            self._expire(job)
+        error = job['error'] or future.exception()
+        return {'status': 'failed' if error else 'done', 'progress': 1.0 if not error else fraction,
+                'stage': stage, 'error': None if error is None else f'{type(error).__name__}: {error}',
+                'elapsed': (job['finished'] or time.time()) - job['submitted']}
+
+    def result(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job['error'] or not job['future'].done() or job['future'].exception():
+            return None
+        return job['future'].result()
+
+    def stats(self):
+        with self.lock:
+            states = [self.status(job_id)['status'] for job_id in self.jobs]
+        return {'submitted': self.submitted, 'deduped': self.deduped,
+                **{s: states.count(s) for s in ('queued', 'running', 'done', 'failed')}}
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+        if self.manager is not None:
+            self.manager.shutdown()
+        self.pool = self.manager = self.progress = None
+        with self.lock:
+            self.jobs.clear()
+
+
+queue = ForecastJobQueue()
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import product
+
+import numpy as np
+
+from pages.utils.instrumentation import collect_spans, record_spans, register_cache, span, timed
+
+# ARIMA forecasting service
+# - fitted models are cached by (ticker, data fingerprint, order)
+# - when new bars arrive for a ticker the previous parameters are used as start_params
+# - the (p, q) order comes from a small AIC search run in a process pool, the pool is started
+#   on the first parallel search and reused, worker start-up would eat most of the speedup
+
+FORECAST_STEPS = 30
+MAX_P = 3
+MAX_Q = 3
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+CACHE_SIZE = 64
+
+
+def fingerprint(data):
+    values = np.ascontiguousarray(np.asarray(data, dtype=float).ravel())
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+def _fit(data, order, start_params=None):
+    from statsmodels.tsa.arima.model import ARIMA  # imported on first fit, not at page load
+    with span('model.fit'), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = ARIMA(np.asarray(data, dtype=float).ravel(), order=order)
+        return model.fit(start_params=start_params)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(max_workers=MAX_WORKERS):
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+# runs in a worker process, returns (aic, order, spans of the fit)
+def _fit_aic(args):
+    data, order = args
+    with collect_spans() as spans:
+        try:
+            aic = _fit(data, order).aic
+        except Exception:
+            aic = np.inf
+    return aic, order, spans
+
+
+@timed('model.order_search')
+def search_order(data, differencing_order, max_p=MAX_P, max_q=MAX_Q, max_workers=MAX_WORKERS):
+    orders = [(p, differencing_order, q) for p, q in product(range(max_p + 1), range(max_q + 1))]
+    jobs = [(data, order) for order in orders]
+    scores = None
+    if max_workers > 1:
+        try:
+            scores = list(get_pool(max_workers).map(_fit_aic, jobs))
+        except BrokenProcessPool:
+            # a worker died (e.g. killed for memory), drop the pool and search in-process this time
+            with _pools_lock:
+                _pools.pop(max_workers, None)
+    in_process = scores is None
+    if in_process:
+        scores = [_fit_aic(job) for job in jobs]
+    for _, _, spans in scores:
+        # fits in this process are already in the totals, only the page run needs them
+        record_spans(spans, totals=not in_process)
+    return min(score[:2] for score in scores)[1]
+
+
+class ForecastService:
+    def __init__(self, cache_size=CACHE_SIZE, max_p=MAX_P, max_q=MAX_Q, max_workers=MAX_WORKERS):
+        self.cache_size = cache_size
+        self.max_p = max_p
+        self.max_q = max_q
+        self.max_workers = max_workers
+        self.models = OrderedDict()
+        self.orders = OrderedDict()
+        self.last_params = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, cache, key, value):
+        with self.lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def order(self, data, differencing_order, ticker=None):
+        key = (ticker, fingerprint(data), differencing_order)
+        with self.lock:
+            if key in self.orders:
+                return self.orders[key]
+        order = search_order(data, differencing_order, self.max_p, self.max_q, self.max_workers)
+        self._remember(self.orders, key, order)
+        return order
+
+    def fit(self, data, order, ticker=None):
+        key = (ticker, fingerprint(data), tuple(order))
+        with self.lock:
+            model_fit = self.models.get(key)
+            if model_fit is not None:
+                self.models.move_to_end(key)
+                self.hits += 1
+                return model_fit
+            self.misses += 1
+            start_params = self.last_params.get((ticker, tuple(order))) if ticker else None
+        try:
+            model_fit = _fit(data, order, start_params)
+        except Exception:
+            if start_params is None:
+                raise
+            model_fit = _fit(data, order)
+        self._remember(self.models, key, model_fit)
+        if ticker:
+            self.last_params[(ticker, tuple(order))] = model_fit.params
+        return model_fit
+
+    def forecast(self, data, order, ticker=None, steps=FORECAST_STEPS):
+        return self.fit(data, order, ticker).get_forecast(steps=steps).predicted_mean
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'models': len(self.models)}
+
+
+service = ForecastService()
+register_cache('forecast_models', service.stats)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pandas as pd
+
+from pages.utils.price_store import MAX_AGE, get_prices
+
+# one shared max-history frame per ticker for the whole process (and pinned per session)
+# the frame's arrays are read-only, callers get a shallow copy so adding columns never
+# leaks into other sessions; tables, metrics and charts all slice this one frame
+
+_frames = {}
+_lock = threading.Lock()
+
+
+def _freeze(df):
+    columns = {}
+    for name in df.columns:
+        values = df[name].to_numpy(copy=True)
+        values.flags.writeable = False
+        columns[name] = values
+    frozen = pd.DataFrame(columns, index=df.index.copy(), copy=False)
+    return frozen
+
+
+def get_history(ticker, session=None, max_age=MAX_AGE):
+    key = f'history:{ticker}'
+    now = time.time()
+    if session is not None and key in session and now - session[key][0] < max_age:
+        return session[key][1].copy(deep=False)
+
+    with _lock:
+        entry = _frames.get(ticker)
+    if entry is None or now - entry[0] >= max_age:
+        df = get_prices(ticker)
+        # an empty frame is a failed or empty download, the next rerun tries again
+        if df.empty:
+            return df
+        entry = (now, _freeze(df))
+        with _lock:
+            _frames[ticker] = entry
+    if session is not None:
+        session[key] = entry
+    return entry[1].copy(deep=False)
+
+
+def clear():
+    with _lock:
+        _frames.clear()
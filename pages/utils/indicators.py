@@ -0,0 +1,186 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.instrumentation import register_cache, timed
+
+# RSI / SMA / MACD engine
+# - compute_indicators() works on the requested window plus a warm-up, never the full history
+# - IndicatorState keeps the rolling state so each new bar is an O(1) update
+# values match ta.momentum.RSIIndicator, ta.trend.SMAIndicator and ta.trend.MACD
+
+RSI_WINDOW = 14
+SMA_WINDOW = 50
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGN = 9
+# EMA start-up error decays as (1 - alpha)^warmup, below 1e-6 after ten slow spans
+WARMUP = 10 * MACD_SLOW
+
+COLUMNS = ['RSI', f'SMA_{SMA_WINDOW}', 'MACD', 'Signal', 'Hist']
+
+
+class IndicatorState:
+    def __init__(self):
+        self.n = 0
+        self.last_close = math.nan
+        self.up_avg = 0.0
+        self.down_avg = 0.0
+        self.window = deque()
+        self.window_sum = 0.0
+        self.ema_fast = math.nan
+        self.ema_slow = math.nan
+        self.signal = math.nan
+        self.signal_n = 0
+
+    def update(self, close):
+        close = float(close)
+        if self.n == 0:
+            # ta treats the first (NaN) diff as a zero move
+            self.ema_fast = self.ema_slow = close
+        else:
+            diff = close - self.last_close
+            self.up_avg += (max(diff, 0.0) - self.up_avg) / RSI_WINDOW
+            self.down_avg += (max(-diff, 0.0) - self.down_avg) / RSI_WINDOW
+            self.ema_fast += 2 / (MACD_FAST + 1) * (close - self.ema_fast)
+            self.ema_slow += 2 / (MACD_SLOW + 1) * (close - self.ema_slow)
+        self.n += 1
+        self.last_close = close
+
+        self.window.append(close)
+        self.window_sum += close
+        if len(self.window) > SMA_WINDOW:
+            self.window_sum -= self.window.popleft()
+
+        macd = math.nan
+        if self.n >= MACD_SLOW:
+            macd = self.ema_fast - self.ema_slow
+            if self.signal_n == 0:
+                self.signal = macd
+            else:
+                self.signal += 2 / (MACD_SIGN + 1) * (macd - self.signal)
+            self.signal_n += 1
+        return self.values(macd)
+
+    def values(self, macd=None):
+        if macd is None:
+            macd = self.ema_fast - self.ema_slow if self.n >= MACD_SLOW else math.nan
+        if self.n < RSI_WINDOW:
+            rsi = math.nan
+        elif self.down_avg == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.up_avg / self.down_avg)
+        sma = self.window_sum / SMA_WINDOW if len(self.window) == SMA_WINDOW else math.nan
+        signal = self.signal if self.signal_n >= MACD_SIGN else math.nan
+        return [rsi, sma, macd, signal, macd - signal]
+
+
+# vectorized pass over close[start_pos - warmup:], returns (frame from start_pos, state after last bar)
+def compute_indicators(close, start_pos=0, warmup=WARMUP):
+    begin = max(start_pos - warmup, 0)
+    values = pd.Series(np.asarray(close, dtype=float)[begin:], index=close.index[begin:])
+    n = len(values)
+    rows = np.arange(n)
+
+    diff = values.diff()
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    up_avg = up.ewm(alpha=1 / RSI_WINDOW, adjust=False).mean()
+    down_avg = down.ewm(alpha=1 / RSI_WINDOW, adjust=False).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(down_avg == 0, 100.0, 100 - 100 / (1 + up_avg / down_avg))
+    rsi[rows < RSI_WINDOW - 1] = np.nan
+
+    sma = values.rolling(SMA_WINDOW).mean()
+
+    ema_fast = values.ewm(span=MACD_FAST, adjust=False).mean()
+    ema_slow = values.ewm(span=MACD_SLOW, adjust=False).mean()
+    macd = (ema_fast - ema_slow).where(rows >= MACD_SLOW - 1)
+    signal_raw = macd.ewm(span=MACD_SIGN, adjust=False).mean()
+    signal = signal_raw.where(rows >= MACD_SLOW + MACD_SIGN - 2)
+
+    frame = pd.DataFrame({
+        COLUMNS[0]: rsi,
+        COLUMNS[1]: sma.to_numpy(),
+        COLUMNS[2]: macd.to_numpy(),
+        COLUMNS[3]: signal.to_numpy(),
+        COLUMNS[4]: (macd - signal).to_numpy(),
+    }, index=values.index)
+
+    state = IndicatorState()
+    if n:
+        state.n = n
+        state.last_close = values.iloc[-1]
+        state.up_avg = up_avg.iloc[-1]
+        state.down_avg = down_avg.iloc[-1]
+        state.window = deque(values.iloc[-SMA_WINDOW:].tolist())
+        state.window_sum = sum(state.window)
+        state.ema_fast = ema_fast.iloc[-1]
+        state.ema_slow = ema_slow.iloc[-1]
+        state.signal_n = max(n - MACD_SLOW + 1, 0)
+        state.signal = signal_raw.iloc[-1] if state.signal_n else math.nan
+    return frame.iloc[start_pos - begin:], state
+
+
+# per-ticker cache of indicator frames; new bars are appended through IndicatorState
+# - each entry keeps the closes its frame was built from; the store re-fetches the last partial
+#   bar and splits / dividends back-adjust history, so an entry whose bars no longer match the
+#   prices passed in is recomputed
+class IndicatorEngine:
+    def __init__(self, max_tickers=512, warmup=WARMUP):
+        self.max_tickers = max_tickers
+        self.warmup = warmup
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, ticker, close, start_pos=0):
+        if len(close) == 0:
+            return pd.DataFrame(columns=COLUMNS)
+        values = np.asarray(close, dtype=float)
+        with self.lock:
+            entry = self.entries.get(ticker)
+            frame = None
+            if entry is not None:
+                frame, state, closes = entry
+                first_needed = close.index[max(start_pos - self.warmup, 0)]
+                first, last = close.index.get_indexer([frame.index[0], frame.index[-1]])
+                if (frame.index[0] > first_needed or first < 0 or last < 0 or last - first + 1 != len(closes)
+                        or not np.array_equal(values[first:last + 1], closes, equal_nan=True)):
+                    frame = None
+                elif last + 1 < len(close):
+                    new = close.iloc[last + 1:]
+                    rows = [state.update(x) for x in values[last + 1:]]
+                    frame = pd.concat([frame, pd.DataFrame(rows, index=new.index, columns=COLUMNS)])
+                    closes = values[first:]
+            if frame is None:
+                self.misses += 1
+                begin = max(start_pos - self.warmup, 0)
+                frame, state = compute_indicators(close, begin, self.warmup)
+                closes = values[begin:]
+            else:
+                self.hits += 1
+            self.entries[ticker] = (frame, state, closes)
+            self.entries.move_to_end(ticker)
+            while len(self.entries) > self.max_tickers:
+                self.entries.popitem(last=False)
+        return frame.loc[close.index[start_pos]:close.index[-1]] if start_pos < len(close) else frame.iloc[0:0]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'tickers': len(self.entries)}
+
+
+_engine = IndicatorEngine()
+register_cache('indicators', _engine.stats)
+
+
+@timed('chart.indicators')
+def get_indicators(close, start_pos=0, ticker=None):
+    if ticker is None:
+        return compute_indicators(close, start_pos)[0]
+    return _engine.get(ticker, close, start_pos)
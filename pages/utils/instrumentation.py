@@ -0,0 +1,235 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# lightweight timing / counter registry for the data, model and chart stages
+# - span('name') / @timed('name') record wall time; totals are process-wide and the spans of
+#   the current page run are also kept per thread (Streamlit runs each session in its own thread)
+# - count() for call counts, record_size() for payload sizes in bytes
+# - cache hit rates are read from the caches' own stats() through register_cache()
+# - snapshot() / to_json() / to_prometheus() export everything; with METRICS_FILE set the
+#   Prometheus text is rewritten after every page run (node_exporter textfile format) and
+#   METRICS_LOG gets one JSON line per run
+# - worker threads join the page run with attach_run(run_context()); worker processes wrap their
+#   work in collect_spans(), return the list with their result and the parent replays it with
+#   record_spans() (a child process records into its own registry, which nobody exports)
+# span names are '<stage>.<what>', e.g. data.download.yahoo, model.fit, chart.build.RSI
+
+METRICS_FILE = os.environ.get('METRICS_FILE')
+METRICS_LOG = os.environ.get('METRICS_LOG')
+PREFIX = 'stock_app'
+
+_lock = threading.Lock()
+_timings = {}  # name -> [calls, total seconds, max seconds]
+_counters = {}
+_sizes = {}  # name -> [samples, total bytes, last bytes]
+_caches = {}
+_run = threading.local()
+
+
+def _total(name, seconds):
+    with _lock:
+        entry = _timings.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+
+def _record(name, seconds):
+    _total(name, seconds)
+    spans = getattr(_run, 'spans', None)
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def record_size(name, nbytes):
+    sizes = getattr(_run, 'sizes', None)
+    with _lock:
+        entry = _sizes.setdefault(name, [0, 0, 0])
+        entry[0] += 1
+        entry[1] += nbytes
+        entry[2] = nbytes
+        if sizes is not None:
+            sizes[name] = sizes.get(name, 0) + nbytes
+
+
+# stats() must return a dict with 'hits' and 'misses' (plus optional 'disk_hits')
+def register_cache(name, stats):
+    _caches[name] = stats
+
+
+def cache_rates():
+    rates = {}
+    for name, stats in list(_caches.items()):
+        s = stats()
+        hits = s.get('hits', 0) + s.get('disk_hits', 0)
+        total = hits + s.get('misses', 0)
+        rates[name] = dict(s, hit_rate=hits / total if total else None)
+    return rates
+
+
+# ---------------------- PAGE RUNS ----------------------
+def start_run(page):
+    _run.page = page
+    _run.spans = []
+    _run.sizes = {}
+    _run.start = time.perf_counter()
+
+
+def run_spans():
+    return list(getattr(_run, 'spans', None) or [])
+
+
+# the current thread's run (its span list and sizes), to hand to worker threads
+def run_context():
+    return getattr(_run, 'spans', None), getattr(_run, 'sizes', None)
+
+
+@contextmanager
+def attach_run(context):
+    saved = run_context()
+    _run.spans, _run.sizes = context
+    try:
+        yield
+    finally:
+        _run.spans, _run.sizes = saved
+
+
+# spans recorded inside the block, for returning from a worker process along with the result
+@contextmanager
+def collect_spans():
+    spans = []
+    with attach_run((spans, {})):
+        yield spans
+
+
+# spans from a worker process: into the process-wide totals and/or this thread's page run
+def record_spans(spans, totals=True, run=True):
+    current = getattr(_run, 'spans', None) if run else None
+    for name, seconds in spans or ():
+        if totals:
+            _total(name, seconds)
+        if current is not None:
+            current.append((name, seconds))
+
+
+def finish_run():
+    page = getattr(_run, 'page', None)
+    if page is None:
+        return []
+    _run.page = None
+    _record(f'page.{page}', time.perf_counter() - _run.start)
+    spans = run_spans()
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
+    if METRICS_LOG:
+        with _lock, open(METRICS_LOG, 'a') as f:
+            f.write(json.dumps({'time': time.time(), 'page': page, 'spans': spans, 'sizes': _run.sizes}) + '\n')
+    return spans
+
+
+# ---------------------- EXPORT ----------------------
+def snapshot():
+    with _lock:
+        timings = {k: {'calls': v[0], 'total': v[1], 'max': v[2]} for k, v in _timings.items()}
+        counters = dict(_counters)
+        sizes = {k: {'samples': v[0], 'total': v[1], 'last': v[2]} for k, v in _sizes.items()}
+    return {'timings': timings, 'counters': counters, 'sizes': sizes, 'caches': cache_rates()}
+
+
+def to_json(indent=None):
+    return json.dumps(snapshot(), indent=indent, default=str)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def to_prometheus():
+    snap = snapshot()
+    lines = []
+
+    def metric(name, kind, samples):
+        lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+        for labels, value in samples:
+            label = ','.join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            lines.append(f'{PREFIX}_{name}{{{label}}} {value}')
+
+    metric('span_seconds_total', 'counter', [({'span': k}, v['total']) for k, v in snap['timings'].items()])
+    metric('span_calls_total', 'counter', [({'span': k}, v['calls']) for k, v in snap['timings'].items()])
+    metric('span_seconds_max', 'gauge', [({'span': k}, v['max']) for k, v in snap['timings'].items()])
+    metric('events_total', 'counter', [({'name': k}, v) for k, v in snap['counters'].items()])
+    metric('payload_bytes_total', 'counter', [({'name': k}, v['total']) for k, v in snap['sizes'].items()])
+    metric('cache_hit_ratio', 'gauge', [({'cache': k}, v['hit_rate']) for k, v in snap['caches'].items()
+                                        if v['hit_rate'] is not None])
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(to_prometheus())
+    os.replace(tmp, path)
+
+
+# ---------------------- STREAMLIT ----------------------
+# debug output is shown with ?debug=1 in the URL or DEBUG_PANEL=1 in the environment
+def debug_enabled():
+    import streamlit as st
+    return os.environ.get('DEBUG_PANEL') == '1' or st.query_params.get('debug') == '1'
+
+
+# st.plotly_chart with the render (serialization + send) timed; the JSON payload is only
+# measured when someone will look at it, it costs a second serialization
+def plotly_chart(fig, name, **kwargs):
+    import streamlit as st
+    with span(f'chart.render.{name}'):
+        st.plotly_chart(fig, **kwargs)
+    if METRICS_FILE or METRICS_LOG or debug_enabled():
+        record_size(f'chart.{name}', len(fig.to_json()))
+
+
+def debug_panel():
+    import pandas as pd
+    import streamlit as st
+
+    if not debug_enabled():
+        return
+    spans = run_spans()
+    with st.expander('Debug: stage timings for this run', expanded=False):
+        if spans:
+            frame = pd.DataFrame(spans, columns=['span', 'seconds'])
+            frame['stage'] = frame['span'].str.split('.').str[0]
+            st.dataframe(frame.groupby('stage')['seconds'].agg(['count', 'sum']).round(4), width='stretch')
+            st.dataframe(frame.round(4), width='stretch')
+        sizes = getattr(_run, 'sizes', None)
+        if sizes:
+            st.write('Payload bytes', sizes)
+        st.write('Caches', cache_rates())
@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from pages.utils.instrumentation import register_cache
+from pages.utils.price_store import count_network_call
+
+# ticker info cache: LRU in memory, TTL-checked JSON snapshots on disk
+# each ticker's info dict is fetched once per TTL and shared by every table on the page
+
+CACHE_DIR = os.environ.get('METADATA_CACHE_DIR', os.path.join('.price_store', 'info'))
+TTL = 24 * 60 * 60
+MAX_ENTRIES = 256
+
+
+def fetch_info(ticker):
+    import yfinance as yf
+    return dict(yf.Ticker(ticker).info)
+
+
+class MetadataCache:
+    def __init__(self, fetch=fetch_info, root=CACHE_DIR, ttl=TTL, max_entries=MAX_ENTRIES):
+        self.fetch = fetch
+        self.root = root
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker.replace('/', '_')}.json")
+
+    def _read_disk(self, ticker):
+        try:
+            with open(self.path(ticker)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry['time'], entry['info']
+
+    def _write_disk(self, ticker, fetched_at, info):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f'{self.path(ticker)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'time': fetched_at, 'info': info}, f, default=str)
+        os.replace(tmp, self.path(ticker))
+
+    def _remember(self, ticker, fetched_at, info):
+        self.entries[ticker] = (fetched_at, info)
+        self.entries.move_to_end(ticker)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, ticker):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(ticker)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.entries.move_to_end(ticker)
+                self.hits += 1
+                return entry[1]
+
+            entry = self._read_disk(ticker)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._remember(ticker, *entry)
+                self.disk_hits += 1
+                return entry[1]
+
+        count_network_call()
+        info = self.fetch(ticker)
+        with self.lock:
+            self.misses += 1
+            self._remember(ticker, now, info)
+        self._write_disk(ticker, now, info)
+        return info
+
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'entries': len(self.entries)}
+
+
+_cache = MetadataCache()
+register_cache('metadata', _cache.stats)
+
+
+# replaces the info download, benchmarks/load_test.py swaps in an offline stand-in
+def set_fetch(fetch):
+    _cache.fetch = fetch
+
+
+def get_info(ticker):
+    return _cache.get(ticker)
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+# period windows ('5d', '1mo', '6mo', 'ytd', '1y', '5y' or a (start, end) range) resolved to
+# integer offsets with a binary search on the sorted DatetimeIndex; slices are row views,
+# and offsets are memoized per (ticker, history length, first bar, last bar, period)
+
+PERIODS = {
+    '5d': relativedelta(days=5),
+    '1mo': relativedelta(months=1),
+    '6mo': relativedelta(months=6),
+    '1y': relativedelta(years=1),
+    '5y': relativedelta(years=5),
+}
+CACHE_SIZE = 1024
+
+_offsets = OrderedDict()
+_lock = threading.Lock()
+
+
+# first date *excluded* from the window, None for the full history
+def period_start(last_bar, num_period):
+    if num_period in PERIODS:
+        return last_bar - PERIODS[num_period]
+    if num_period == 'ytd':
+        return pd.Timestamp(last_bar.year, 1, 1, tz=last_bar.tz)
+    return None
+
+
+def _as_index_time(value, index):
+    value = pd.Timestamp(value)
+    if index.tz is not None and value.tz is None:
+        return value.tz_localize(index.tz)
+    if index.tz is None and value.tz is not None:
+        return value.tz_localize(None)
+    return value
+
+
+def _resolve(index, num_period):
+    if isinstance(num_period, tuple):
+        start, end = (None if d is None else _as_index_time(d, index) for d in num_period)
+        lo = 0 if start is None else index.searchsorted(start, side='left')
+        hi = len(index) if end is None else index.searchsorted(end, side='right')
+        return lo, hi
+    start = period_start(index[-1], num_period)
+    lo = 0 if start is None else index.searchsorted(start, side='right')
+    return lo, len(index)
+
+
+def period_offsets(index, num_period, ticker=None):
+    if len(index) == 0:
+        return 0, 0
+    key = (ticker, len(index), index[0], index[-1], num_period)
+    with _lock:
+        if key in _offsets:
+            _offsets.move_to_end(key)
+            return _offsets[key]
+    offsets = _resolve(index, num_period)
+    with _lock:
+        _offsets[key] = offsets
+        while len(_offsets) > CACHE_SIZE:
+            _offsets.popitem(last=False)
+    return offsets
+
+
+def period_slice(dataframe, num_period, ticker=None):
+    lo, hi = period_offsets(dataframe.index, num_period, ticker)
+    return dataframe.iloc[lo:hi]
@@ -1,10 +1,13 @@
 import plotly.graph_objects as go
-import dateutil
-import datetime
 import numpy as np
-import ta   # ✔ REPLACED pandas_ta
+from pages.utils.indicators import get_indicators
+from pages.utils.periods import period_offsets, period_slice
+from pages.utils.downsample import CHART_WIDTH, lttb, max_candles, max_points, resample_ohlc
+from pages.utils.figure_cache import cached_figure
+from pages.utils.instrumentation import timed
 
 # ---------------------- TABLE ----------------------
+@timed('chart.build.plotly_table_glassmorphism')
 def plotly_table_glassmorphism(dataframe, title=None, height=None):
     colors = {
         'header': 'rgba(255, 75, 75, 0.9)',
@@ -15,14 +18,14 @@ def plotly_table_glassmorphism(dataframe, title=None, height=None):
         'text': "#FEFEFF"
     }
 
-    row_colors = [colors['row_odd'] if i % 2 == 0 else colors['row_even']
-                  for i in range(len(dataframe))]
+    # columns go to plotly as numpy arrays (typed arrays in the JSON payload), no per-cell Python lists
+    row_colors = np.where(np.arange(len(dataframe)) % 2 == 0, colors['row_odd'], colors['row_even'])
 
     column_headers = ["<b>🎯 Index</b>"] + [f"<b>✨ {col}</b>" for col in dataframe.columns]
 
-    cell_values = [[f"<b>{idx}</b>" for idx in dataframe.index]]
+    cell_values = [('<b>' + dataframe.index.astype(str) + '</b>').to_numpy()]
     for col in dataframe.columns:
-        cell_values.append(dataframe[col].tolist())
+        cell_values.append(dataframe[col].to_numpy())
 
     if height is None:
         height = 50 + len(dataframe) * 40 + (60 if title else 15) + 30
@@ -39,7 +42,7 @@ def plotly_table_glassmorphism(dataframe, title=None, height=None):
             ),
             cells=dict(
                 values=cell_values,
-                fill_color=[['rgba(0,0,0,0)'] + row_colors],
+                fill_color=[['rgba(0,0,0,0)'] + row_colors.tolist()],
                 align=['center'] + ['left'] * len(dataframe.columns),
                 line_color=colors['border'],
                 font=dict(color=colors['text'], size=14),
@@ -58,98 +61,106 @@ def plotly_table_glassmorphism(dataframe, title=None, height=None):
     return fig
 
 # ---------------------- FILTER ----------------------
-def filter_data(dataframe, num_period):
-    if num_period == '1mo':
-        date = dataframe.index[-1] + dateutil.relativedelta.relativedelta(months=-1)
-    elif num_period == '5d':
-        date = dataframe.index[-1] + dateutil.relativedelta.relativedelta(days=-5)
-    elif num_period == '6mo':
-        date = dataframe.index[-1] + dateutil.relativedelta.relativedelta(months=-6)
-    elif num_period == '1y':
-        date = dataframe.index[-1] + dateutil.relativedelta.relativedelta(years=-1)
-    elif num_period == '5y':
-        date = dataframe.index[-1] + dateutil.relativedelta.relativedelta(years=-5)
-    elif num_period == 'ytd':
-        date = datetime.datetime(dataframe.index[-1].year, 1, 1).strftime('%Y-%m-%d')
-    else:
-        date = dataframe.index[0]
-
-    return dataframe.reset_index()[dataframe.reset_index()['Date'] > date]
+# returns a row view of the period window, the Date index is kept (see pages/utils/periods.py)
+def filter_data(dataframe, num_period, ticker=None):
+    return period_slice(dataframe, num_period, ticker)
 
 # ---------------------- CHARTS ----------------------
-def close_chart(dataframe, num_period=False):
+# line traces are reduced with LTTB to about one point per pixel of `width`, pass width=None to keep every bar
+def line_trace(x, y, width=CHART_WIDTH, **kwargs):
+    if width:
+        x, y = lttb(x, y, max_points(width))
+    return go.Scatter(x=x, y=y, **kwargs)
+
+@timed('chart.build.close_chart')
+@cached_figure('close_chart')
+def close_chart(dataframe, num_period=False, width=CHART_WIDTH, ticker=None):
     if num_period:
-        dataframe = filter_data(dataframe, num_period)
+        dataframe = filter_data(dataframe, num_period, ticker)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Open'], mode='lines', name='Open'))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Close'], mode='lines', name='Close'))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['High'], mode='lines', name='High'))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Low'], mode='lines', name='Low'))
+    fig.add_trace(line_trace(dataframe.index, dataframe['Open'], width, mode='lines', name='Open'))
+    fig.add_trace(line_trace(dataframe.index, dataframe['Close'], width, mode='lines', name='Close'))
+    fig.add_trace(line_trace(dataframe.index, dataframe['High'], width, mode='lines', name='High'))
+    fig.add_trace(line_trace(dataframe.index, dataframe['Low'], width, mode='lines', name='Low'))
 
     fig.update_xaxes(rangeslider_visible=True)
     fig.update_layout(height=500)
     return fig
 
-def candlestick(dataframe, num_period):
-    dataframe = filter_data(dataframe, num_period)
+# long ranges are drawn as weekly / monthly candles so each candle stays a few pixels wide
+@timed('chart.build.candlestick')
+@cached_figure('candlestick')
+def candlestick(dataframe, num_period, width=CHART_WIDTH, ticker=None):
+    dataframe = filter_data(dataframe, num_period, ticker)
+    if width:
+        dataframe = resample_ohlc(dataframe, max_candles(width))
 
     fig = go.Figure()
     fig.add_trace(go.Candlestick(
-        x=dataframe['Date'], open=dataframe['Open'],
+        x=dataframe.index, open=dataframe['Open'],
         high=dataframe['High'], low=dataframe['Low'],
         close=dataframe['Close']
     ))
     fig.update_layout(height=500)
     return fig
 
-# ---------------------- RSI ----------------------
-def RSI(dataframe, num_period):
-    dataframe['RSI'] = ta.momentum.RSIIndicator(dataframe['Close']).rsi()
+# ---------------------- INDICATORS ----------------------
+# indicators are computed for the visible window plus warm-up, the caller's frame is not modified
+def indicator_window(dataframe, num_period, ticker=None):
+    start_pos, end_pos = period_offsets(dataframe.index, num_period, ticker)
+    indicators = get_indicators(dataframe['Close'], start_pos, ticker).iloc[:end_pos - start_pos]
+    return dataframe.iloc[start_pos:end_pos], indicators
 
-    dataframe = filter_data(dataframe, num_period)
+# ---------------------- RSI ----------------------
+# the 70 / 30 bands are straight lines, two points each instead of one per bar (none for an empty window)
+@timed('chart.build.RSI')
+@cached_figure('RSI')
+def RSI(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe, indicators = indicator_window(dataframe, num_period, ticker)
+    ends = dataframe.index[[0, -1]] if len(dataframe) else dataframe.index
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['RSI'], name='RSI'))
+    fig.add_trace(line_trace(dataframe.index, indicators['RSI'].to_numpy(), width, name='RSI'))
 
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=[70]*len(dataframe),
+    fig.add_trace(go.Scatter(x=ends, y=np.full(len(ends), 70),
                              name='Overbought', line=dict(dash='dash')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=[30]*len(dataframe),
+    fig.add_trace(go.Scatter(x=ends, y=np.full(len(ends), 30),
                              name='Oversold', line=dict(dash='dash')))
     fig.update_layout(yaxis_range=[0,100], height=200)
     return fig
 
 # ---------------------- SMA ----------------------
-def Moving_average(dataframe, num_period):
-    dataframe['SMA_50'] = ta.trend.SMAIndicator(dataframe['Close'], window=50).sma_indicator()
-
-    dataframe = filter_data(dataframe, num_period)
+@timed('chart.build.Moving_average')
+@cached_figure('Moving_average')
+def Moving_average(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe, indicators = indicator_window(dataframe, num_period, ticker)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Close'], name='Close'))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['SMA_50'], name='SMA 50'))
+    fig.add_trace(line_trace(dataframe.index, dataframe['Close'], width, name='Close'))
+    fig.add_trace(line_trace(dataframe.index, indicators['SMA_50'].to_numpy(), width, name='SMA 50'))
     fig.update_xaxes(rangeslider_visible=True)
     fig.update_layout(height=500)
     return fig
 
 # ---------------------- MACD ----------------------
-def MACD(dataframe, num_period):
-    macd_indicator = ta.trend.MACD(dataframe['Close'])
-
-    dataframe['MACD'] = macd_indicator.macd()
-    dataframe['Signal'] = macd_indicator.macd_signal()
-    dataframe['Hist'] = macd_indicator.macd_diff()
-
-    dataframe = filter_data(dataframe, num_period)
+@timed('chart.build.MACD')
+@cached_figure('MACD')
+def MACD(dataframe, num_period, ticker=None, width=CHART_WIDTH):
+    dataframe, indicators = indicator_window(dataframe, num_period, ticker)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['MACD'], name='MACD'))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Signal'], name='Signal'))
-    fig.add_trace(go.Bar(x=dataframe['Date'], y=dataframe['Hist'], name='Histogram'))
+    fig.add_trace(line_trace(dataframe.index, indicators['MACD'].to_numpy(), width, name='MACD'))
+    fig.add_trace(line_trace(dataframe.index, indicators['Signal'].to_numpy(), width, name='Signal'))
+    x, hist = dataframe.index, indicators['Hist'].to_numpy()
+    if width:
+        x, hist = lttb(x, hist, max_points(width))
+    fig.add_trace(go.Bar(x=x, y=hist, name='Histogram'))
     fig.update_layout(height=200)
     return fig
 
 # ---------------------- FORECAST ----------------------
+@timed('chart.build.Moving_average_forecast')
 def Moving_average_forecast(forecast):
     import plotly.graph_objects as go
     fig = go.Figure()
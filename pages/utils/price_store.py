@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from pages.utils.alignment import trading_days
+from pages.utils.instrumentation import count, span
+
+# on-disk parquet store for daily price histories, one file per (source, ticker)
+# only the bars after the last stored date are downloaded on refresh
+# downloads are rate limited per source across all sessions; store reads are not limited
+
+STORE_DIR = os.environ.get('PRICE_STORE_DIR', '.price_store')
+MAX_AGE = 60 * 60  # seconds before a stored series is checked for new bars
+RATE_LIMITS = {'yahoo': 10, 'fred': 5}  # requests per second
+
+
+# ---------------------- FETCHERS ----------------------
+# a fetcher has a `source` name and fetch(ticker, start=None, end=None) returning a
+# DataFrame with a tz-naive DatetimeIndex named 'Date'; start=None means full history
+
+def _normalize_index(df):
+    df.index = trading_days(df.index)
+    df.index.name = 'Date'
+    return df
+
+
+class YahooFetcher:
+    source = 'yahoo'
+
+    def fetch(self, ticker, start=None, end=None):
+        import yfinance as yf
+        if start is None:
+            df = yf.Ticker(ticker).history(period='max')
+        else:
+            df = yf.Ticker(ticker).history(start=start, end=end)
+        return _normalize_index(df)
+
+
+class FredFetcher:
+    source = 'fred'
+
+    def fetch(self, ticker, start=None, end=None):
+        import pandas_datareader.data as web
+        if start is None:
+            start = date.today() - timedelta(days=365 * 10)
+        df = web.DataReader([ticker], 'fred', start, end)
+        return _normalize_index(df)
+
+
+# ---------------------- NETWORK CALLS ----------------------
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# one limiter per source for the whole process
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(source):
+    with _limiters_lock:
+        if source not in _limiters:
+            _limiters[source] = RateLimiter(RATE_LIMITS.get(source))
+        return _limiters[source]
+
+
+# counted per thread, Streamlit runs each session's script in its own thread
+_calls = threading.local()
+
+
+def count_network_call():
+    _calls.count = getattr(_calls, 'count', 0) + 1
+    count('network_calls')
+
+
+def network_calls():
+    return getattr(_calls, 'count', 0)
+
+
+# ---------------------- STORE ----------------------
+class PriceStore:
+    def __init__(self, fetcher, root=STORE_DIR, max_age=MAX_AGE):
+        self.fetcher = fetcher
+        self.root = os.path.join(root, fetcher.source)
+        self.max_age = max_age
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker.replace('/', '_')}.parquet")
+
+    def read(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path, memory_map=True)
+
+    def write(self, ticker, df):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f'{self.path(ticker)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        df.to_parquet(tmp)
+        os.replace(tmp, self.path(ticker))
+
+    def is_fresh(self, ticker):
+        path = self.path(ticker)
+        return os.path.exists(path) and time.time() - os.path.getmtime(path) < self.max_age
+
+    def refresh(self, ticker, full=False):
+        stored = None if full else self.read(ticker)
+        get_limiter(self.fetcher.source).wait()
+        count_network_call()
+        if stored is None or stored.empty:
+            with span(f'data.download.{self.fetcher.source}'):
+                df = self.fetcher.fetch(ticker)
+        else:
+            # refetch from the last stored bar so a partial intraday bar gets replaced
+            last = stored.index[-1]
+            with span(f'data.download.{self.fetcher.source}'):
+                new = self.fetcher.fetch(ticker, start=last.date())
+            if new is None or new.empty:
+                df = stored
+            else:
+                df = pd.concat([stored[stored.index < new.index[0]], new])
+        if df is None or df.empty:
+            return stored
+        self.write(ticker, df)
+        return df
+
+    def get(self, ticker, start=None, end=None, refresh=True):
+        if refresh and not self.is_fresh(ticker):
+            df = self.refresh(ticker)
+        else:
+            df = self.read(ticker)
+            if df is None:
+                df = self.refresh(ticker)
+        if df is None:
+            return pd.DataFrame()
+        return slice_dates(df, start, end)
+
+
+# rows with start <= Date < end, taken as a positional slice of the sorted index
+def slice_dates(df, start=None, end=None):
+    lo = 0 if start is None else df.index.searchsorted(pd.Timestamp(start), side='left')
+    hi = len(df) if end is None else df.index.searchsorted(pd.Timestamp(end), side='left')
+    return df.iloc[lo:hi]
+
+
+# ---------------------- DEFAULT STORES ----------------------
+_stores = {}
+_fetchers = {'yahoo': YahooFetcher(), 'fred': FredFetcher()}
+
+
+def set_fetcher(source, fetcher):
+    _fetchers[source] = fetcher
+    _stores.pop(source, None)
+
+
+def get_store(source='yahoo'):
+    if source not in _stores:
+        _stores[source] = PriceStore(_fetchers[source], STORE_DIR)
+    return _stores[source]
+
+
+def get_prices(ticker, source='yahoo', start=None, end=None):
+    return get_store(source).get(ticker, start=start, end=end)
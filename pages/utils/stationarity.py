@@ -0,0 +1,176 @@
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+from pages.utils.instrumentation import register_cache, timed
+
+# differencing order detection with ADF tests
+# - d is capped at MAX_D, a series that never becomes stationary returns MAX_D
+# - a constant series (e.g. a halted ticker, or a linear trend once differenced) counts as
+#   stationary at that d with a NaN statistic; adfuller rejects constant input
+# - results are cached per series; a series that only gained a few bars reuses the cached d
+# - adf_many() / differencing_orders() test every column of a price matrix in one batched regression
+
+ALPHA = 0.05
+MAX_D = 2
+RETEST_AFTER = 20  # new observations before a cached series is tested again
+IDENTITY_BARS = 20  # leading values that identify "the same series, extended"
+CACHE_SIZE = 1024
+CONSTANT_RTOL = 1e-10  # range relative to magnitude below which a series counts as constant
+SINGULAR_TOL = 1e-10  # smallest eigenvalue of the unit-diagonal X'X below which a fit is singular
+
+
+# statsmodels is imported on first use so importing this module stays cheap
+@timed('model.adfuller')
+def adf_pvalue(series):
+    from statsmodels.tsa.stattools import adfuller
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        result = adfuller(np.asarray(series, dtype=float).ravel())
+    return result[1], result[0]
+
+
+# works per column for a 2-D array; rounding leaves a differenced linear trend a few ulps off constant
+def _is_constant(values, axis=None):
+    return np.ptp(values, axis=axis) <= CONSTANT_RTOL * np.abs(values).max(axis=axis)
+
+
+def find_differencing_order(series, alpha=ALPHA, max_d=MAX_D):
+    values = np.asarray(series, dtype=float).ravel()
+    tests = []
+    for d in range(max_d + 1):
+        if _is_constant(values):
+            tests.append({'d': d, 'p_value': np.nan, 'adf_stat': np.nan})
+            return d, tests, True
+        p_value, stat = adf_pvalue(values)
+        tests.append({'d': d, 'p_value': p_value, 'adf_stat': stat})
+        if p_value <= alpha:
+            return d, tests, True
+        if d < max_d:
+            values = np.diff(values)
+    return max_d, tests, False
+
+
+def _digest(values):
+    return hashlib.sha1(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+
+class StationarityCache:
+    def __init__(self, retest_after=RETEST_AFTER, max_entries=CACHE_SIZE):
+        self.retest_after = retest_after
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, series, alpha=ALPHA, max_d=MAX_D):
+        values = np.asarray(series, dtype=float).ravel()
+        key = (_digest(values[:IDENTITY_BARS]), alpha, max_d)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                n = entry['n']
+                # same series with fewer than retest_after new bars: keep the cached result
+                if n <= len(values) < n + self.retest_after and _digest(values[:n]) == entry['digest']:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+
+        d, tests, stationary = find_differencing_order(values, alpha, max_d)
+        entry = {'d': d, 'tests': tests, 'stationary': stationary,
+                 'n': len(values), 'digest': _digest(values)}
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+_cache = StationarityCache()
+register_cache('stationarity', _cache.stats)
+
+
+def differencing_order(series, alpha=ALPHA, max_d=MAX_D):
+    return _cache.get(series, alpha, max_d)['d']
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+# ---------------------- VECTORIZED ----------------------
+# ADF regression with a constant and a fixed lag for every column of an (N, K) array:
+#   dy_t = a + g * y_(t-1) + sum_i c_i * dy_(t-i) + e_t
+# with the same lag this matches adfuller(y, maxlag=lags, autolag=None); the per-series path
+# uses adfuller's AIC lag selection, so borderline series can get a different d
+# a constant or collinear column has no unique fit and gets a NaN statistic and p-value
+@timed('model.adf_many')
+def adf_many(values, lags=None):
+    from statsmodels.tsa.adfvalues import mackinnonp
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    n, k = y.shape
+    if lags is None:
+        lags = int(np.ceil(12 * (n / 100) ** 0.25))
+        lags = max(0, min(lags, n // 2 - 2))
+
+    dy = np.diff(y, axis=0)
+    m = len(dy) - lags
+    columns = [np.ones((m, k)), y[lags:-1]]
+    for i in range(1, lags + 1):
+        columns.append(dy[lags - i:-i])
+    X = np.stack(columns, axis=2).transpose(1, 0, 2)  # (K, m, p)
+    target = dy[lags:].T[:, :, None]  # (K, m, 1)
+
+    # smallest eigenvalue of X'X scaled to unit diagonal: at rounding level for collinear columns
+    xtx = X.transpose(0, 2, 1) @ X
+    diag = np.sqrt(np.diagonal(xtx, axis1=1, axis2=2))
+    scale = np.divide(1.0, diag, out=np.zeros_like(diag), where=diag > 0)
+    full = np.linalg.eigvalsh(xtx * scale[:, :, None] * scale[:, None, :])[:, 0] > SINGULAR_TOL
+
+    stat = np.full(k, np.nan)
+    p_value = np.full(k, np.nan)
+    if not full.all():
+        X, target, xtx = X[full], target[full], xtx[full]
+    if full.any():
+        xtx_inv = np.linalg.inv(xtx)
+        coef = xtx_inv @ (X.transpose(0, 2, 1) @ target)
+        resid = target - X @ coef
+        dof = m - X.shape[2]
+        sigma2 = (resid[:, :, 0] ** 2).sum(axis=1) / dof
+        stat[full] = coef[:, 1, 0] / np.sqrt(sigma2 * xtx_inv[:, 1, 1])
+        p_value[full] = [mackinnonp(s, regression='c', N=1) for s in stat[full]]
+    return stat, p_value
+
+
+# differencing order for every column at once, columns must share the same dates (no NaN)
+def differencing_orders(values, alpha=ALPHA, max_d=MAX_D, lags=None):
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    orders = np.full(y.shape[1], max_d)
+    pending = np.arange(y.shape[1])
+    for d in range(max_d + 1):
+        constant = _is_constant(y[:, pending], axis=0)
+        orders[pending[constant]] = d
+        pending = pending[~constant]
+        if not len(pending):
+            break
+        _, p_value = adf_many(y[:, pending], lags)
+        passed = p_value <= alpha
+        orders[pending[passed]] = d
+        pending = pending[~passed]
+        if not len(pending) or d == max_d:
+            break
+        y = np.diff(y, axis=0)
+    return orders
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages.utils.alignment import align_prices, trading_days
+
+DAYS = pd.bdate_range('2024-01-01', periods=20, name='Date')
+
+
+def make_benchmark(days=DAYS):
+    return pd.DataFrame({'sp500': np.arange(len(days), dtype=float) + 1000}, index=days)
+
+
+def make_close(days=DAYS, start=100.0):
+    return pd.Series(np.arange(len(days), dtype=float) + start, index=days, name='Close')
+
+
+# a 2-day gap (rows 3-4) and a 5-day gap (rows 10-14)
+def gapped():
+    close = make_close()
+    return close.drop(DAYS[[3, 4, 10, 11, 12, 13, 14]])
+
+
+def test_drop_policy_drops_every_gap_row():
+    frame, stats = align_prices({'A': gapped()}, make_benchmark(), policy='drop')
+    assert len(frame) == 13 and stats['dropped_rows'] == 7
+    assert stats['columns'].loc['A', 'filled'] == 0
+
+
+def test_ffill_policy_fills_every_gap():
+    frame, stats = align_prices({'A': gapped()}, make_benchmark(), policy='ffill')
+    assert len(frame) == 20
+    assert frame['A'].iloc[10:15].tolist() == [109.0] * 5
+    assert stats['columns'].loc['A', 'filled'] == 7
+
+
+def test_limit_policy_fills_short_gaps_and_drops_long_ones_whole():
+    frame, stats = align_prices({'A': gapped()}, make_benchmark(), policy='limit', limit=3)
+    assert frame['A'].loc[DAYS[3]:DAYS[4]].tolist() == [102.0, 102.0]
+    assert not frame.index.isin(DAYS[10:15]).any()
+    assert len(frame) == 15 and stats['dropped_rows'] == 5
+    assert stats['columns'].loc['A', 'filled'] == 2
+
+    # a gap of exactly `limit` rows is still filled
+    frame, _ = align_prices({'A': gapped()}, make_benchmark(), policy='limit', limit=5)
+    assert len(frame) == 20
+
+
+def test_limit_policy_works_per_column():
+    other = make_close(start=50.0).drop(DAYS[[3, 4, 5, 6]])
+    frame, stats = align_prices({'A': gapped(), 'B': other}, make_benchmark(), policy='limit', limit=3)
+    assert not frame.index.isin(DAYS[3:7]).any()
+    assert not frame.index.isin(DAYS[10:15]).any()
+    assert stats['columns']['filled'].tolist() == [2, 0]
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError):
+        align_prices({'A': make_close()}, make_benchmark(), policy='bfill')
+
+
+def test_tz_aware_indexes_keep_their_wall_clock_date():
+    # yfinance stamps bars at local midnight; in UTC that is still the same date
+    close = make_close()
+    close.index = close.index.tz_localize('America/New_York')
+    benchmark = make_benchmark()
+    benchmark.index = benchmark.index.tz_localize('UTC') + pd.Timedelta(hours=16)
+    frame, stats = align_prices({'A': close}, benchmark)
+    assert frame.index.equals(DAYS)
+    assert frame.index.tz is None
+    assert stats['columns'].loc['A', 'off_calendar'] == 0
+    assert trading_days(close.index).equals(DAYS)
+
+
+def test_nan_benchmark_dates_are_not_on_the_calendar():
+    benchmark = make_benchmark()
+    benchmark.iloc[[5, 6]] = np.nan
+    frame, stats = align_prices({'A': make_close()}, benchmark)
+    assert len(frame) == 18 and not frame.index.isin(DAYS[[5, 6]]).any()
+    assert stats['calendar_days'] == 18 and stats['benchmark_gaps'] == 2
+    assert stats['columns'].loc['A', 'off_calendar'] == 2
+
+
+def test_duplicate_benchmark_dates_keep_the_last_bar():
+    benchmark = make_benchmark()
+    extra = benchmark.iloc[[7]] - 500
+    benchmark = pd.concat([benchmark.iloc[:8], extra, benchmark.iloc[8:]])
+    frame, stats = align_prices({'A': make_close()}, benchmark)
+    assert frame.index.equals(DAYS)
+    assert frame.loc[DAYS[7], 'sp500'] == 507.0
+    assert stats['benchmark_gaps'] == 1
+    # an unsorted download is put in date order
+    assert align_prices({'A': make_close()}, make_benchmark().iloc[::-1])[0].index.equals(DAYS)
+
+
+def test_stats_and_input_layouts():
+    a = gapped()
+    b = make_close(start=50.0).iloc[5:]
+    frame, stats = align_prices({'A': a, 'B': b}, make_benchmark(), policy='drop', benchmark_name='mkt')
+    assert list(frame.columns) == ['A', 'B', 'mkt']
+    assert stats['policy'] == 'drop' and stats['rows'] == len(frame) == 10
+    assert stats['calendar_days'] == 20 and stats['dropped_rows'] == 10 and stats['benchmark_gaps'] == 0
+    columns = stats['columns']
+    assert columns['missing'].tolist() == [7, 5]
+    assert columns['coverage'].tolist() == pytest.approx([13 / 20, 15 / 20])
+
+    ohlc = {name: s.to_frame('Close').assign(Open=0.0) for name, s in (('A', a), ('B', b))}
+    same_index = pd.DataFrame({'A': make_close(), 'B': make_close(start=50.0)})
+    for prices in (ohlc, [a.rename('A'), b.rename('B')]):
+        pd.testing.assert_frame_equal(align_prices(prices, make_benchmark(), policy='drop', benchmark_name='mkt')[0], frame)
+    assert len(align_prices(same_index, make_benchmark())[0]) == 20
+
+    kept, stats = align_prices({'A': a}, make_benchmark(), policy='drop', dropna=False)
+    assert len(kept) == 20 and stats['dropped_rows'] == 0 and kept['A'].isna().sum() == 7
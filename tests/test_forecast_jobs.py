@@ -0,0 +1,140 @@
+import sys
+import time
+import types
+
+import pytest
+
+from pages.utils import instrumentation
+from pages.utils.forecast_jobs import ForecastJobQueue
+
+
+# runners execute in the pool's worker processes, so they live at module level
+def failing_runner(job_id, ticker, config, progress=None):
+    raise ValueError(f'no data for {ticker}')
+
+
+def quick_runner(job_id, ticker, config, progress=None):
+    return {'ticker': ticker}
+
+
+def stuck_runner(job_id, ticker, config, progress=None):
+    time.sleep(5)
+
+
+def span_runner(job_id, ticker, config, progress=None):
+    with instrumentation.span('test.worker'):
+        return {'ticker': ticker}
+
+
+def wait(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while queue.status(job_id)['status'] in ('queued', 'running'):
+        assert time.time() < deadline, 'job did not finish'
+        time.sleep(0.05)
+    return queue.status(job_id)
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(**kwargs):
+        queue = ForecastJobQueue(max_workers=1, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def test_failed_job_is_kept_and_reported(make_queue):
+    queue = make_queue(runner=failing_runner)
+    job_id = queue.submit('BAD')
+    assert wait(queue, job_id)['status'] == 'failed'
+
+    # page reruns keep submitting: the failure is served, not re-run
+    for _ in range(5):
+        assert queue.submit('BAD') == job_id
+        status = queue.status(job_id)
+        assert status['status'] == 'failed'
+        assert status['error'] == 'ValueError: no data for BAD'
+    assert queue.stats()['submitted'] == 6
+    assert queue.stats()['deduped'] == 5
+    assert queue.result(job_id) is None
+
+
+def test_retry_reruns_a_failed_job_only(make_queue):
+    queue = make_queue(runner=failing_runner)
+    job_id = queue.submit('BAD')
+    first = queue.jobs[job_id]['future']
+    wait(queue, job_id)
+
+    assert queue.submit('BAD', retry=True) == job_id
+    assert queue.jobs[job_id]['future'] is not first
+    assert wait(queue, job_id)['status'] == 'failed'
+
+    queue.runner = quick_runner
+    done_id = queue.submit('AAPL')
+    wait(queue, done_id)
+    done = queue.jobs[done_id]['future']
+    queue.submit('AAPL', retry=True)
+    assert queue.jobs[done_id]['future'] is done
+
+
+def test_expired_jobs_are_pruned(make_queue):
+    queue = make_queue(runner=failing_runner, result_ttl=0.2)
+    job_id = queue.submit('BAD')
+    wait(queue, job_id)
+    time.sleep(0.3)
+
+    queue.runner = quick_runner
+    other = queue.submit('AAPL')
+    assert job_id not in queue.jobs
+    wait(queue, other)
+
+    # an expired failure is run again on the next plain submit
+    assert queue.submit('BAD') == job_id
+    assert wait(queue, job_id)['status'] == 'done'
+
+
+def test_workers_do_not_inherit_locks_held_by_server_threads(make_queue):
+    queue = make_queue(runner=span_runner, job_timeout=20)
+    # another session's thread holds the instrumentation lock while the worker process starts
+    with instrumentation._lock:
+        job_id = queue.submit('AAPL')
+        time.sleep(0.5)
+    assert wait(queue, job_id)['status'] == 'done'
+
+
+def test_overdue_job_fails_and_later_jobs_still_run(make_queue):
+    queue = make_queue(runner=stuck_runner, job_timeout=1)
+    stuck = queue.submit('STUCK')
+    queued = queue.submit('QUEUED')
+    status = wait(queue, stuck)
+    assert status['status'] == 'failed' and status['error'].startswith('TimeoutError')
+    assert wait(queue, queued)['status'] == 'failed'
+    assert queue.result(stuck) is None
+    assert queue.submit('STUCK') == stuck and queue.status(stuck)['status'] == 'failed'
+
+    # the stuck worker keeps its slot, new jobs get a fresh pool
+    queue.runner = quick_runner
+    job_id = queue.submit('AAPL')
+    assert wait(queue, job_id)['status'] == 'done'
+    assert queue.submit('STUCK', retry=True) == stuck
+    assert wait(queue, stuck)['status'] == 'done'
+
+
+def test_workers_do_not_run_the_page_script(make_queue, tmp_path, monkeypatch):
+    # Streamlit points __main__ at the page being run
+    marker = tmp_path / 'ran'
+    page = tmp_path / 'page.py'
+    page.write_text(f'open({str(marker)!r}, "w").close()\n')
+    main = types.ModuleType('__main__')
+    main.__file__ = str(page)
+    monkeypatch.setitem(sys.modules, '__main__', main)
+
+    queue = make_queue(runner=quick_runner)
+    assert wait(queue, queue.submit('AAPL'))['status'] == 'done'
+    assert sys.modules['__main__'] is main
+    assert not marker.exists()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages.utils import history_cache
+
+
+@pytest.fixture
+def prices(monkeypatch):
+    monkeypatch.setattr(history_cache, '_frames', {})
+    served = {'frame': None, 'calls': 0}
+
+    def get_prices(ticker):
+        served['calls'] += 1
+        return served['frame']
+
+    monkeypatch.setattr(history_cache, 'get_prices', get_prices)
+    return served
+
+
+def make_history(n=5):
+    index = pd.bdate_range('2024-01-01', periods=n, name='Date')
+    return pd.DataFrame({'Close': np.arange(n, dtype=float), 'Volume': np.arange(n) * 10}, index=index)
+
+
+def test_history_is_fetched_once_and_shared(prices):
+    prices['frame'] = make_history()
+    first = history_cache.get_history('AAPL')
+    second = history_cache.get_history('AAPL', {})
+    assert prices['calls'] == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_mutating_a_returned_frame_does_not_touch_the_cache(prices):
+    original = make_history()
+    prices['frame'] = original.copy()
+    session = {}
+    df = history_cache.get_history('AAPL', session)
+
+    df['Close'] = -1.0
+    df['SMA'] = 0.0
+    df.iloc[0, 1] = -5
+    df.loc[df.index[1], 'Volume'] = -5
+    df.drop(columns='Volume', inplace=True)
+    with pytest.raises(ValueError):
+        history_cache.get_history('AAPL')['Close'].to_numpy()[0] = -1.0
+
+    for fresh in (history_cache.get_history('AAPL'), history_cache.get_history('AAPL', session)):
+        pd.testing.assert_frame_equal(fresh, original, check_freq=False)
+
+
+def test_empty_download_is_not_cached(prices):
+    prices['frame'] = pd.DataFrame()
+    session = {}
+    assert history_cache.get_history('AAPL', session).empty
+    assert 'AAPL' not in history_cache._frames
+    assert not session
+
+    prices['frame'] = make_history()
+    assert len(history_cache.get_history('AAPL', session)) == 5
+    assert prices['calls'] == 2
@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages.utils import indicators
+from pages.utils.indicators import COLUMNS, IndicatorEngine, IndicatorState, compute_indicators
+
+SEEDS = range(5)
+
+
+def make_close(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2020-01-01', periods=n, name='Date')
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), index=index, name='Close')
+
+
+# the ta definitions (RSIIndicator, SMAIndicator, MACD with fillna=False), one bar at a time
+def ref_ema(xs, alpha, min_periods):
+    out, ema, seen = [], math.nan, 0
+    for x in xs:
+        if not math.isnan(x):
+            ema = x if seen == 0 else ema + alpha * (x - ema)
+            seen += 1
+        out.append(ema if seen >= min_periods else math.nan)
+    return out
+
+
+def ref_indicators(close):
+    close = list(close)
+    n = len(close)
+    diffs = [math.nan] + [close[i] - close[i - 1] for i in range(1, n)]
+    up = ref_ema([d if d > 0 else 0.0 for d in diffs], 1 / 14, 14)
+    down = ref_ema([-d if d < 0 else 0.0 for d in diffs], 1 / 14, 14)
+    rsi = [math.nan if math.isnan(u) else 100.0 if d == 0 else 100 - 100 / (1 + u / d) for u, d in zip(up, down)]
+    sma = [sum(close[i - 49:i + 1]) / 50 if i >= 49 else math.nan for i in range(n)]
+    fast = ref_ema(close, 2 / 13, 12)
+    slow = ref_ema(close, 2 / 27, 26)
+    macd = [f - s for f, s in zip(fast, slow)]
+    signal = ref_ema(macd, 2 / 10, 9)
+    return np.column_stack([rsi, sma, macd, signal, [m - s for m, s in zip(macd, signal)]])
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_full_pass_matches_ta_definitions(seed):
+    close = make_close(300, seed)
+    np.testing.assert_allclose(compute_indicators(close)[0].to_numpy(), ref_indicators(close), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_warm_up_window_matches_full_history(seed):
+    close = make_close(1000, seed)
+    frame, _ = compute_indicators(close, start_pos=700)
+    assert frame.index[0] == close.index[700]
+    np.testing.assert_allclose(frame.to_numpy(), ref_indicators(close)[700:], rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_incremental_updates_equal_full_recompute(seed):
+    close = make_close(400, seed)
+    _, state = compute_indicators(close.iloc[:100])
+    rows = [state.update(x) for x in close.iloc[100:]]
+    np.testing.assert_allclose(rows, compute_indicators(close)[0].to_numpy()[100:], rtol=1e-9, atol=1e-9)
+
+    fresh = IndicatorState()
+    rows = [fresh.update(x) for x in close]
+    np.testing.assert_allclose(rows, compute_indicators(close)[0].to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_engine_appends_new_bars():
+    close = make_close(600)
+    engine = IndicatorEngine()
+    engine.get('AAPL', close.iloc[:500], 300)
+    frame = engine.get('AAPL', close, 300)
+
+    assert engine.stats() == {'hits': 1, 'misses': 1, 'tickers': 1}
+    assert frame.index.equals(close.index[300:])
+    np.testing.assert_allclose(frame.to_numpy(), compute_indicators(close, 300)[0].to_numpy(), rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize('revise', ['last_bar', 'back_adjusted', 'dropped_bar'])
+def test_engine_recomputes_when_stored_bars_change(revise):
+    close = make_close(600)
+    engine = IndicatorEngine()
+    engine.get('AAPL', close, 300)
+
+    if revise == 'last_bar':
+        # the partial intraday bar is re-fetched at a different price
+        close = close.copy()
+        close.iloc[-1] *= 1.5
+    elif revise == 'back_adjusted':
+        # a 2:1 split back-adjusts everything before the last ten bars
+        close = close.copy()
+        close.iloc[:-10] /= 2
+    else:
+        close = close.drop(close.index[450])
+    frame = engine.get('AAPL', close, 300)
+
+    assert engine.stats()['misses'] == 2
+    pd.testing.assert_frame_equal(frame, compute_indicators(close, 300)[0], check_freq=False)
+
+
+def test_get_indicators_without_ticker_bypasses_the_engine(monkeypatch):
+    monkeypatch.setattr(indicators, '_engine', IndicatorEngine())
+    close = make_close(100)
+    frame = indicators.get_indicators(close, 20)
+    assert list(frame.columns) == COLUMNS
+    assert indicators._engine.stats()['misses'] == 0
+    assert indicators.get_indicators(close.iloc[:0], 0, 'AAPL').empty
@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from pages.utils import forecasting, instrumentation
+from pages.utils.fetcher import fetch_many
+from pages.utils.forecast_jobs import ForecastJobQueue
+from pages.utils.instrumentation import collect_spans, record_spans, span
+
+
+def span_names(spans):
+    return sorted(name for name, _ in spans)
+
+
+def calls(name):
+    return instrumentation.snapshot()['timings'].get(name, {}).get('calls', 0)
+
+
+def test_fetch_threads_record_into_the_callers_run():
+    def fetch(ticker, source='yahoo', start=None, end=None):
+        with span(f'test.fetch.{ticker}'):
+            return pd.DataFrame({'Close': [1.0]})
+
+    instrumentation.start_run('test')
+    fetch_many([('yahoo', 'A'), ('yahoo', 'B'), ('fred', 'C')], fetch=fetch)
+    spans = instrumentation.finish_run()
+    assert [n for n in span_names(spans) if n.startswith('test.fetch')] == \
+        ['test.fetch.A', 'test.fetch.B', 'test.fetch.C']
+
+
+def test_collect_and_record_spans():
+    instrumentation.start_run('test')
+    with collect_spans() as collected:
+        with span('test.collected'):
+            pass
+    assert span_names(collected) == ['test.collected']
+    assert 'test.collected' not in span_names(instrumentation.run_spans())
+
+    before = calls('test.replayed')
+    record_spans([('test.replayed', 0.5)])
+    record_spans([('test.replayed', 0.5)], totals=False)
+    record_spans([('test.replayed', 0.5)], run=False)
+    assert calls('test.replayed') == before + 2
+    assert span_names(instrumentation.finish_run()).count('test.replayed') == 2
+
+
+# runs in the queue's worker process
+def spanning_runner(job_id, ticker, config, progress=None):
+    with collect_spans() as spans:
+        with span('test.worker.stage'):
+            time.sleep(0.01)
+    return {'ticker': ticker, 'spans': spans}
+
+
+def test_worker_process_spans_reach_the_parent_totals_once():
+    queue = ForecastJobQueue(max_workers=1, runner=spanning_runner)
+    try:
+        before = calls('test.worker.stage')
+        job_id = queue.submit('AAPL')
+        deadline = time.time() + 30
+        while queue.status(job_id)['status'] != 'done':
+            assert time.time() < deadline
+            time.sleep(0.05)
+        time.sleep(0.1)  # the done callback runs on the pool's management thread
+        queue.submit('AAPL')
+        assert calls('test.worker.stage') == before + 1
+        assert span_names(queue.result(job_id)['spans']) == ['test.worker.stage']
+    finally:
+        queue.shutdown()
+
+
+def test_order_search_pool_spans_reach_the_run():
+    data = np.cumsum(np.random.default_rng(0).normal(size=120))
+    instrumentation.start_run('test')
+    forecasting.search_order(data, 1, max_p=1, max_q=1, max_workers=2)
+    spans = instrumentation.finish_run()
+    forecasting.shutdown_pools()
+    assert span_names(spans).count('model.fit') == 4
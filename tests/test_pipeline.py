@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import CAPM_functions
+import CAPM_pipeline
+import CAPM_returns
+from benchmarks.synthetic import make_market
+from pages.utils.fetcher import FetchResult
+
+
+@pytest.fixture
+def market(monkeypatch):
+    stocks, benchmark = make_market(n_tickers=3, years=1, holiday_rate=0.0)
+
+    def fetch_many(items, start=None, end=None):
+        result = FetchResult()
+        for source, ticker in items:
+            result.data[(source, ticker)] = benchmark if source == 'fred' else stocks[ticker]
+        return result
+
+    monkeypatch.setattr(CAPM_pipeline, 'fetch_many', fetch_many)
+    return stocks, benchmark
+
+
+def test_returns_start_at_the_second_date(market):
+    result = CAPM_pipeline.run_capm(['T0', 'T1', 'T2'], end='2026-01-03')
+    assert len(result.returns) == len(result.prices) - 1
+    assert result.returns['Date'].tolist() == result.prices['Date'].iloc[1:].tolist()
+    assert result.returns.index.equals(pd.RangeIndex(len(result.returns)))
+
+    prices = result.prices[['T0', 'T1', 'T2', 'sp500']].to_numpy()
+    np.testing.assert_allclose(result.returns[['T0', 'T1', 'T2', 'sp500']], (prices[1:] / prices[:-1] - 1) * 100)
+
+
+def test_capm_uses_observed_returns_only(market):
+    result = CAPM_pipeline.run_capm(['T0', 'T1', 'T2'], end='2026-01-03')
+    with_placeholder = CAPM_returns.simple_returns(result.prices, percent=True)
+    pd.testing.assert_frame_equal(result.capm, CAPM_functions.calculate_capm(with_placeholder.iloc[1:]))
+    assert not np.allclose(result.capm['alpha'], CAPM_functions.calculate_capm(with_placeholder)['alpha'])
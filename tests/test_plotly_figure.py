@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.synthetic import make_ohlc
+from pages.utils import plotly_figure
+from pages.utils.figure_cache import estimate_size
+
+BUILDERS = ['close_chart', 'candlestick', 'RSI', 'Moving_average', 'MACD']
+
+
+@pytest.mark.parametrize('name', BUILDERS)
+def test_builders_accept_an_empty_window(name):
+    fig = getattr(plotly_figure, name)(make_ohlc(300).iloc[:0], '1y')
+    fig.to_json()
+    assert all(len(trace.x) == 0 for trace in fig.data)
+
+
+@pytest.mark.parametrize('name', BUILDERS)
+@pytest.mark.parametrize('period', ['1y', 'max'])
+def test_size_estimate_is_close_to_the_payload(name, period):
+    fig = getattr(plotly_figure, name)(make_ohlc(252 * 20, seed=1), period)
+    assert 0.6 < estimate_size(fig) / len(fig.to_json()) < 1.5
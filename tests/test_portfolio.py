@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from scipy.optimize import minimize
+
+import CAPM_portfolio
+from benchmarks.synthetic import make_returns
+
+RF = 0.02
+
+
+@pytest.fixture(scope='module')
+def moments():
+    stocks, mu, cov = CAPM_portfolio.return_moments(make_returns(1500, 8, seed=3))
+    return mu, cov
+
+
+def sharpe(w, mu, cov, rf=RF):
+    return (mu @ w - rf) / np.sqrt(w @ cov @ w)
+
+
+def slsqp(objective, n):
+    cons = {'type': 'eq', 'fun': lambda w: w.sum() - 1}
+    return minimize(objective, np.full(n, 1 / n), constraints=cons, tol=1e-14).x
+
+
+def test_min_variance_matches_slsqp(moments):
+    mu, cov = moments
+    result = CAPM_portfolio.optimize(mu, cov, rf=RF)
+    reference = slsqp(lambda w: w @ cov @ w, len(mu))
+    np.testing.assert_allclose(result['min_variance'][0], reference, atol=1e-4)
+    assert result['min_variance'][0].sum() == pytest.approx(1)
+
+
+def test_max_sharpe_matches_slsqp(moments):
+    mu, cov = moments
+    result = CAPM_portfolio.optimize(mu, cov, rf=RF)
+    w, ret, sd, best = result['max_sharpe']
+    reference = slsqp(lambda w: -sharpe(w, mu, cov), len(mu))
+    assert w.sum() == pytest.approx(1)
+    assert best == pytest.approx(sharpe(w, mu, cov))
+    assert best >= sharpe(reference, mu, cov) - 1e-8
+    assert best == pytest.approx(sharpe(reference, mu, cov), rel=1e-5)
+
+
+def test_no_random_portfolio_beats_the_frontier(moments):
+    mu, cov = moments
+    result = CAPM_portfolio.optimize(mu, cov, rf=RF)
+    targets, vol, weights = result['frontier']
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    np.testing.assert_allclose(weights @ mu, targets)
+
+    rng = np.random.default_rng(0)
+    w = rng.normal(size=(20000, len(mu)))
+    w /= w.sum(axis=1, keepdims=True)
+    ret = w @ mu
+    sd = np.sqrt(np.einsum('ij,jk,ik->i', w, cov, w))
+    inside = (ret >= targets[0]) & (ret <= targets[-1])
+    assert inside.sum() > 1000
+    assert (sd[inside] >= np.interp(ret[inside], targets, vol) - 1e-9).all()
+    assert (sd >= result['min_variance'][2] - 1e-12).all()
+    assert ((ret - RF) / sd <= result['max_sharpe'][3] + 1e-12).all()
+
+
+def test_no_tangency_portfolio_when_rf_above_min_variance_return(moments):
+    mu, cov = moments
+    min_variance_return = CAPM_portfolio.optimize(mu, cov)['min_variance'][1]
+    result = CAPM_portfolio.optimize(mu, cov, rf=min_variance_return + 0.01)
+    assert result['max_sharpe'] is None
+    assert result['min_variance'][1] == pytest.approx(min_variance_return)
+
+
+def test_efficient_frontier_drops_max_sharpe_row_without_tangency():
+    df = make_returns(1500, 5, seed=1)
+    _, mu, cov = CAPM_portfolio.return_moments(df)
+    min_variance_return = CAPM_portfolio.optimize(mu, cov)['min_variance'][1]
+
+    portfolios, _ = CAPM_portfolio.efficient_frontier(df, rf=min_variance_return - 0.01)
+    assert list(portfolios.index) == ['Minimum Variance', 'Max Sharpe']
+    portfolios, frontier = CAPM_portfolio.efficient_frontier(df, rf=min_variance_return + 0.01)
+    assert list(portfolios.index) == ['Minimum Variance']
+    assert frontier['Return'].is_monotonic_increasing
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages.utils import price_store
+from pages.utils.price_store import PriceStore, slice_dates
+
+
+# offline stand-in for YahooFetcher: serves `history`, records every call
+class StubFetcher:
+    source = 'stub'
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def fetch(self, ticker, start=None, end=None):
+        self.calls.append((ticker, start, end))
+        return slice_dates(self.history, start, end)
+
+
+def make_history(n=10, start='2024-01-01'):
+    index = pd.bdate_range(start, periods=n, name='Date')
+    return pd.DataFrame({'Close': np.arange(n, dtype=float) + 100}, index=index)
+
+
+def test_first_get_downloads_full_history_then_reads_store(tmp_path):
+    fetcher = StubFetcher(make_history())
+    store = PriceStore(fetcher, root=str(tmp_path))
+
+    first = store.get('AAPL')
+    second = store.get('AAPL')
+
+    assert fetcher.calls == [('AAPL', None, None)]
+    pd.testing.assert_frame_equal(first, fetcher.history, check_freq=False)
+    pd.testing.assert_frame_equal(second, fetcher.history, check_freq=False)
+
+
+def test_refresh_tops_up_from_last_stored_bar(tmp_path):
+    fetcher = StubFetcher(make_history(10))
+    store = PriceStore(fetcher, root=str(tmp_path), max_age=0)
+    store.get('AAPL')
+
+    # three new bars, and the last stored bar (a partial intraday bar) gets revised
+    grown = make_history(13)
+    grown.iloc[9, 0] = -1.0
+    fetcher.history = grown
+    df = store.get('AAPL')
+
+    assert fetcher.calls[-1] == ('AAPL', grown.index[9].date(), None)
+    pd.testing.assert_frame_equal(df, grown, check_freq=False)
+    assert not df.index.has_duplicates
+    pd.testing.assert_frame_equal(store.read('AAPL'), grown, check_freq=False)
+
+
+def test_empty_top_up_keeps_stored_history(tmp_path):
+    fetcher = StubFetcher(make_history(10))
+    store = PriceStore(fetcher, root=str(tmp_path), max_age=0)
+    stored = store.get('AAPL')
+
+    fetcher.history = make_history(0)
+    df = store.get('AAPL')
+
+    pd.testing.assert_frame_equal(df, stored, check_freq=False)
+
+
+def test_slice_dates_end_is_exclusive():
+    df = make_history(10)
+    dates = df.index
+
+    assert slice_dates(df, start=dates[2], end=dates[5]).index.tolist() == dates[2:5].tolist()
+    assert slice_dates(df, end=dates[0]).empty
+    assert slice_dates(df, start=dates[-1]).index.tolist() == [dates[-1]]
+    # bounds between bars: start rounds forward, end still excludes nothing past it
+    between = dates[3] + pd.Timedelta(hours=12)
+    assert slice_dates(df, start=between).index[0] == dates[4]
+    assert slice_dates(df, end=between).index[-1] == dates[3]
+    assert len(slice_dates(df)) == len(df)
+
+
+@pytest.fixture
+def default_stores(tmp_path, monkeypatch):
+    monkeypatch.setattr(price_store, 'STORE_DIR', str(tmp_path))
+    monkeypatch.setattr(price_store, '_stores', {})
+    monkeypatch.setattr(price_store, '_fetchers', dict(price_store._fetchers))
+
+
+def test_set_fetcher_swaps_source_and_drops_cached_store(default_stores):
+    first = StubFetcher(make_history(5))
+    price_store.set_fetcher('yahoo', first)
+    store = price_store.get_store('yahoo')
+    assert store.fetcher is first
+    price_store.get_prices('AAPL')
+
+    second = StubFetcher(make_history(5))
+    price_store.set_fetcher('yahoo', second)
+    assert price_store.get_store('yahoo') is not store
+    assert price_store.get_store('yahoo').fetcher is second
+    assert price_store.get_store('fred').fetcher is price_store._fetchers['fred']
+    # the file written through the first fetcher is still served, no new download
+    price_store.get_prices('AAPL')
+    assert second.calls == []
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.waits = 0
+
+    def wait(self):
+        self.waits += 1
+
+
+def test_only_downloads_wait_on_the_rate_limit(tmp_path, monkeypatch):
+    limiter = CountingLimiter()
+    monkeypatch.setattr(price_store, '_limiters', {'stub': limiter})
+    store = PriceStore(StubFetcher(make_history()), root=str(tmp_path))
+
+    store.get('AAPL')
+    for _ in range(5):
+        store.get('AAPL')
+    assert limiter.waits == 1
+
+    store.refresh('AAPL')
+    assert limiter.waits == 2
+
+
+def test_rate_limit_is_shared_per_source(monkeypatch):
+    monkeypatch.setattr(price_store, '_limiters', {})
+    monkeypatch.setitem(price_store.RATE_LIMITS, 'stub', 20)
+    assert price_store.get_limiter('stub') is price_store.get_limiter('stub')
+    assert price_store.get_limiter('stub') is not price_store.get_limiter('other')
+
+    limiter = price_store.get_limiter('stub')
+    began = time.perf_counter()
+    for _ in range(5):
+        limiter.wait()
+    assert time.perf_counter() - began >= 4 / 20 - 0.01
@@ -0,0 +1,162 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import CAPM_returns
+
+SEEDS = range(10)
+
+
+# random positive price matrix of random shape, some cells NaN (gaps, late listings)
+def random_prices(seed, nan_rate=0.1):
+    rng = np.random.default_rng(seed)
+    n, k = rng.integers(1, 40), rng.integers(1, 6)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, k)), axis=0))
+    prices[rng.random((n, k)) < nan_rate] = np.nan
+    return prices
+
+
+# reference implementations, one cell at a time
+def ref_simple(prices, percent=False):
+    n, k = prices.shape
+    out = np.zeros((n, k))
+    for j in range(k):
+        for i in range(1, n):
+            out[i, j] = (prices[i, j] - prices[i - 1, j]) / prices[i - 1, j] * (100 if percent else 1)
+    return out
+
+
+def ref_log(prices):
+    n, k = prices.shape
+    out = np.zeros((n, k))
+    for j in range(k):
+        for i in range(1, n):
+            out[i, j] = math.log(prices[i, j]) - math.log(prices[i - 1, j])
+    return out
+
+
+def ref_cumulative(returns, log=False):
+    n, k = returns.shape
+    out = np.zeros((n, k))
+    for j in range(k):
+        total = 0.0 if log else 1.0
+        for i in range(n):
+            total = total + returns[i, j] if log else total * (1 + returns[i, j])
+            out[i, j] = total if log else total - 1
+    return out
+
+
+def ref_rebase(prices, base):
+    n, k = prices.shape
+    out = np.full((n, k), np.nan)
+    for j in range(k):
+        first = next((prices[i, j] for i in range(n) if not math.isnan(prices[i, j])), math.nan)
+        for i in range(n):
+            out[i, j] = prices[i, j] / first * base
+    return out
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('percent', [False, True])
+def test_simple_returns_match_loop(seed, percent):
+    prices = random_prices(seed)
+    before = prices.copy()
+    out = CAPM_returns.simple_returns(prices, percent=percent)
+    np.testing.assert_allclose(out, ref_simple(prices, percent), equal_nan=True)
+    assert (out[0] == 0).all()
+    np.testing.assert_array_equal(prices, before)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_log_returns_match_loop(seed):
+    prices = random_prices(seed)
+    out = CAPM_returns.log_returns(prices)
+    np.testing.assert_allclose(out, ref_log(prices), equal_nan=True)
+    np.testing.assert_allclose(CAPM_returns.log_returns(prices, percent=True), out * 100, equal_nan=True)
+    assert (out[0] == 0).all()
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_excess_returns_match_loop(seed):
+    returns = ref_simple(random_prices(seed), percent=True)
+    out = CAPM_returns.excess_returns(returns, rf=4.5, periods=252)
+    expected = returns - 4.5 / 252
+    expected[0] = 0
+    np.testing.assert_allclose(out, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('log', [False, True])
+def test_cumulative_returns_match_loop(seed, log):
+    returns = ref_log(random_prices(seed, nan_rate=0)) if log else ref_simple(random_prices(seed, nan_rate=0))
+    out = CAPM_returns.cumulative_returns(returns, log=log)
+    np.testing.assert_allclose(out, ref_cumulative(returns, log), atol=1e-12)
+    np.testing.assert_allclose(CAPM_returns.cumulative_returns(returns * 100, log=log, percent=True),
+                               out * 100, atol=1e-10)
+    if not log:
+        # compounding the simple returns gets back to the price ratio
+        prices = random_prices(seed, nan_rate=0)
+        np.testing.assert_allclose(out, prices / prices[0] - 1, atol=1e-12)
+
+
+def test_cumulative_returns_nan_propagates():
+    returns = np.array([[0.0], [0.1], [np.nan], [0.1]])
+    out = CAPM_returns.cumulative_returns(returns)
+    np.testing.assert_allclose(out[:2, 0], [0.0, 0.1])
+    assert np.isnan(out[2:, 0]).all()
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rebase_matches_loop(seed):
+    prices = random_prices(seed, nan_rate=0.3)
+    np.testing.assert_allclose(CAPM_returns.rebase(prices, base=100), ref_rebase(prices, 100), equal_nan=True)
+
+
+def test_rebase_uses_first_valid_price_and_all_nan_column():
+    prices = np.array([[np.nan, np.nan, 5.0], [2.0, np.nan, 10.0], [4.0, np.nan, 20.0]])
+    out = CAPM_returns.rebase(prices)
+    np.testing.assert_allclose(out[:, 0], [np.nan, 1.0, 2.0], equal_nan=True)
+    assert np.isnan(out[:, 1]).all()
+    np.testing.assert_allclose(out[:, 2], [1.0, 2.0, 4.0])
+
+
+def test_nan_price_gives_nan_on_both_sides():
+    prices = np.array([[10.0], [np.nan], [12.0], [15.0]])
+    for fn in (CAPM_returns.simple_returns, CAPM_returns.log_returns):
+        out = fn(prices)[:, 0]
+        assert out[0] == 0
+        assert np.isnan(out[1]) and np.isnan(out[2])
+        assert np.isfinite(out[3])
+
+
+def test_single_row_and_nan_first_row():
+    assert (CAPM_returns.simple_returns(np.array([[5.0, 7.0]])) == 0).all()
+    out = CAPM_returns.simple_returns(np.array([[np.nan], [2.0], [3.0]]))[:, 0]
+    assert out[0] == 0 and np.isnan(out[1]) and out[2] == pytest.approx(0.5)
+    assert (CAPM_returns.excess_returns(np.array([[np.nan, 1.0]]), rf=5) == 0).all()
+
+
+def test_frames_keep_date_and_index_and_are_not_modified():
+    index = pd.RangeIndex(10, 14)
+    df = pd.DataFrame({'Date': pd.bdate_range('2024-01-01', periods=4), 'A': [1.0, 2.0, 4.0, 2.0],
+                       'sp500': [10.0, 11.0, 11.0, 12.1]}, index=index)
+    before = df.copy()
+    for fn in (CAPM_returns.simple_returns, CAPM_returns.log_returns, CAPM_returns.rebase,
+               CAPM_returns.excess_returns, CAPM_returns.cumulative_returns):
+        out = fn(df)
+        assert list(out.columns) == ['Date', 'A', 'sp500']
+        assert out.index.equals(index)
+        pd.testing.assert_series_equal(out['Date'], df['Date'])
+    pd.testing.assert_frame_equal(df, before)
+    np.testing.assert_allclose(CAPM_returns.simple_returns(df, percent=True)['A'], [0, 100, 100, -50])
+
+
+def test_float32_stays_float32():
+    prices = random_prices(1, nan_rate=0)
+    for fn in (CAPM_returns.simple_returns, CAPM_returns.log_returns, CAPM_returns.rebase,
+               CAPM_returns.excess_returns, CAPM_returns.cumulative_returns):
+        out = fn(prices, dtype=np.float32)
+        assert out.dtype == np.float32
+        np.testing.assert_allclose(out, fn(prices), rtol=1e-4, atol=1e-5)
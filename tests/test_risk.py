@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import CAPM_risk
+from benchmarks.synthetic import make_returns
+
+
+def test_risk_report_counts_every_row():
+    df = make_returns(250, 3, seed=1)
+    weights = np.array([0.5, 0.3, 0.2])
+    report = CAPM_risk.risk_report(df, weights, alphas=(0.95,), n_paths=1000)
+
+    observed = df[['T0', 'T1', 'T2']].to_numpy() / 100
+    var, cvar = CAPM_risk.historical(observed, weights, 0.95)
+    assert report.loc['Historical', 'VaR 95%'] == pytest.approx(var)
+    assert report.loc['Historical', 'CVaR 95%'] == pytest.approx(cvar)
+
+    # the first row is an observation like any other
+    shifted = pd.concat([df.iloc[:1].assign(T0=-50.0), df.iloc[1:]])
+    assert CAPM_risk.risk_report(shifted, weights, alphas=(0.95,), n_paths=1000).loc['Historical', 'CVaR 95%'] > cvar
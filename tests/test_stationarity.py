@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from pages.utils import stationarity
+from pages.utils.stationarity import adf_many, differencing_orders, find_differencing_order
+
+
+def make_columns(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0, 1, n)
+    walk = 100 + np.cumsum(rng.normal(0, 1, n))
+    return np.column_stack([noise, walk])
+
+
+@pytest.mark.parametrize('series, d', [
+    (np.full(300, 42.0), 0),  # halted ticker
+    (np.linspace(10, 20, 300), 1),  # constant once differenced
+])
+def test_constant_series_is_stationary_with_nan_statistic(series, d):
+    order, tests, stationary = find_differencing_order(series)
+    assert (order, stationary) == (d, True)
+    assert np.isnan(tests[-1]['p_value']) and np.isnan(tests[-1]['adf_stat'])
+    assert stationarity.StationarityCache().get(series)['d'] == d
+
+
+def test_regular_series_orders():
+    noise, walk = make_columns().T
+    assert find_differencing_order(noise)[0] == 0
+    assert find_differencing_order(walk)[0] == 1
+
+
+@pytest.mark.filterwarnings('ignore::FutureWarning')
+def test_batch_matches_adfuller_with_fixed_lag():
+    from statsmodels.tsa.stattools import adfuller
+    y = make_columns()
+    stat, p_value = adf_many(y, lags=3)
+    for j in range(y.shape[1]):
+        result = adfuller(y[:, j], maxlag=3, autolag=None)
+        assert stat[j] == pytest.approx(result[0], rel=1e-8)
+        assert p_value[j] == pytest.approx(result[1], rel=1e-6)
+
+
+def test_degenerate_columns_do_not_sink_the_batch():
+    y = make_columns()
+    n = len(y)
+    degenerate = np.column_stack([np.full(n, 5.0), np.linspace(1, 2, n), np.arange(n, dtype=float) ** 2])
+    stat, p_value = adf_many(np.column_stack([y, degenerate]))
+    assert np.isfinite(stat[:2]).all() and np.isnan(stat[2:]).all() and np.isnan(p_value[2:]).all()
+
+    orders = differencing_orders(np.column_stack([y[:, :1], degenerate, y[:, 1:]]))
+    assert orders.tolist() == [0, 0, 1, 2, 1]
+    assert orders[[0, -1]].tolist() == differencing_orders(y).tolist()